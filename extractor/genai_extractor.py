@@ -1,9 +1,12 @@
+import io
 import os
 import time
 import json
 import google.generativeai as genai
 from datetime import datetime
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -14,6 +17,16 @@ VIDEOS_DIR = "data/videos"
 TRANSCRIPTS_DIR = "data/transcripts"
 SUPPORTED_VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
 METADATA_FILE = "config/index_metadata.json"
+# Uploads and generation are network-bound, so several videos can run at once
+MAX_CONCURRENT_TRANSCRIPTIONS = 4
+_METADATA_LOCK = threading.Lock()
+
+# Patterns used per transcript line, compiled once
+# UUID pattern with or without dashes
+_UUID_RE = re.compile(
+    r'[0-9a-f]{8}[-]?[0-9a-f]{4}[-]?[0-9a-f]{4}[-]?[0-9a-f]{4}[-]?[0-9a-f]{12}'
+)
+_SPEAKER_RE = re.compile(r'<v ([^>]+)>(.*)</v>')
 
 
 def load_metadata():
@@ -25,15 +38,18 @@ def load_metadata():
 
 
 def save_metadata(metadata):
-    """Save metadata to file."""
+    """Save metadata to file atomically (write a temp file, then replace)."""
     os.makedirs(os.path.dirname(METADATA_FILE), exist_ok=True)
-    with open(METADATA_FILE, 'w', encoding='utf-8') as f:
+    tmp_file = METADATA_FILE + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
         json.dump(metadata, f, indent=2)
+    os.replace(tmp_file, METADATA_FILE)
 
 
-def get_video_metadata(video_path):
-    """Get metadata for a specific video."""
-    metadata = load_metadata()
+def get_video_metadata(video_path, metadata=None):
+    """Get metadata for a specific video (from `metadata` if already loaded)."""
+    if metadata is None:
+        metadata = load_metadata()
     video_name = os.path.basename(video_path)
     
     for entry in metadata.get("transcript_metadata", []):
@@ -42,58 +58,71 @@ def get_video_metadata(video_path):
     return None
 
 
-def should_process_video(video_path):
+def should_process_video(video_path, metadata=None, file_stat=None):
     """Check if a video needs to be processed based on modification time."""
-    video_metadata = get_video_metadata(video_path)
+    video_metadata = get_video_metadata(video_path, metadata)
     if not video_metadata:
         return True
     
-    video_stat = os.stat(video_path)
+    video_stat = file_stat or os.stat(video_path)
     video_mtime = datetime.fromtimestamp(video_stat.st_mtime)
     last_processed = datetime.fromisoformat(video_metadata["last_processed"])
     
     return video_mtime > last_processed
 
 
-def update_metadata(video_path, vtt_file):
-    """Update metadata for a processed video."""
-    metadata = load_metadata()
-    video_name = os.path.basename(video_path)
-    file_stat = os.stat(video_path)
+def update_metadata(video_path, vtt_file, metadata=None, file_stat=None):
+    """
+    Update metadata for a processed video.
+
+    When an already-loaded `metadata` dict is passed it is updated in memory
+    and the caller is responsible for saving it; otherwise the file is read
+    and written back immediately.
+    """
+    # Serialize the read-modify-write across concurrent transcriptions
+    with _METADATA_LOCK:
+        persist = metadata is None
+        if persist:
+            metadata = load_metadata()
+        video_name = os.path.basename(video_path)
+        file_stat = file_stat or os.stat(video_path)
     
-    # Create new metadata entry
-    new_metadata = {
-        "file_path": video_name,
-        "last_processed": datetime.now().isoformat(),
-        "file_size": file_stat.st_size,
-        "modified_time": datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
-        "vtt_file": os.path.basename(vtt_file),
-    }
+        # Create new metadata entry
+        new_metadata = {
+            "file_path": video_name,
+            "last_processed": datetime.now().isoformat(),
+            "file_size": file_stat.st_size,
+            "modified_time": datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
+            "vtt_file": os.path.basename(vtt_file),
+        }
     
-    # Find and update existing entry or add new one
-    found = False
-    for entry in metadata.get("transcript_metadata", []):
-        if entry.get("metadata", {}).get("file_path") == video_name:
-            entry["metadata"] = new_metadata
-            found = True
-            break
+        # Find and update existing entry or add new one
+        found = False
+        for entry in metadata.get("transcript_metadata", []):
+            if entry.get("metadata", {}).get("file_path") == video_name:
+                entry["metadata"] = new_metadata
+                found = True
+                break
     
-    if not found:
-        if not metadata.get("transcript_metadata"):
-            metadata["transcript_metadata"] = []
-        metadata["transcript_metadata"].append({"metadata": new_metadata})
+        if not found:
+            if not metadata.get("transcript_metadata"):
+                metadata["transcript_metadata"] = []
+            metadata["transcript_metadata"].append({"metadata": new_metadata})
     
-    save_metadata(metadata)
-    return new_metadata
+        if persist:
+            save_metadata(metadata)
+        return new_metadata
 
 
 def get_video_files():
     """Get all video files from the videos directory."""
-    video_files = []
-    for filename in os.listdir(VIDEOS_DIR):
-        if filename.lower().endswith(SUPPORTED_VIDEO_EXTENSIONS):
-            video_files.append(os.path.join(VIDEOS_DIR, filename))
-    return video_files
+    # scandir yields entries with the path prebuilt and the file type from
+    # the directory listing, avoiding a join and stat per file
+    with os.scandir(VIDEOS_DIR) as entries:
+        return [
+            entry.path for entry in entries
+            if entry.is_file() and entry.name.lower().endswith(SUPPORTED_VIDEO_EXTENSIONS)
+        ]
 
 
 def generate_filename(video_filename, extension):
@@ -105,58 +134,75 @@ def generate_filename(video_filename, extension):
 
 def format_timestamp(timestamp):
     """Format timestamp to ensure exactly 3 decimal places."""
-    if '.' in timestamp:
-        main, decimal = timestamp.split('.')
-        decimal = decimal[:3].ljust(3, '0')
-        return f"{main}.{decimal}"
+    main, sep, decimal = timestamp.rpartition('.')
+    if sep:
+        return f"{main}.{(decimal + '000')[:3]}"
     return f"{timestamp}.000"
 
 
 def is_uuid_line(line):
     """Check if a line contains UUID pattern."""
-    # UUID pattern with or without dashes
-    uuid_pattern = r'[0-9a-f]{8}[-]?[0-9a-f]{4}[-]?[0-9a-f]{4}[-]?[0-9a-f]{4}[-]?[0-9a-f]{12}'
-    return bool(re.search(uuid_pattern, line))
+    return bool(_UUID_RE.search(line))
 
 
 def clean_vtt_content(content):
     """Clean and format the VTT content."""
-    lines = content.strip().split('\n')
-    cleaned_lines = ['WEBVTT', '']
+    return parse_and_format(content)[0]
+
+
+def parse_and_format(content):
+    """
+    Clean and format the VTT content and extract its transcript data in one pass.
+    
+    Equivalent to running clean_vtt_content and then extract_transcript_data
+    on its output, without walking the transcript twice.
     
+    Returns:
+        Tuple of (formatted VTT string, list of segment dicts)
+    """
+    out = io.StringIO()
+    out.write('WEBVTT\n')
+    
+    segments = []
     current_segment = None
     
-    for line in lines:
+    for line in io.StringIO(content):
         line = line.strip()
         if not line or line == 'WEBVTT' or is_uuid_line(line):
             continue
         
-        # Format timestamps if present
-        if '-->' in line:
-            if current_segment:
-                cleaned_lines.extend(current_segment)
-                cleaned_lines.append('')
+        # Format timestamps if present (partition scans and splits in one go)
+        start, sep, end = line.partition(' --> ')
+        if sep:
+            # Blank line separating this segment from the header/previous one
+            out.write('\n')
             
             # Format timestamp line
-            start, end = line.split(' --> ')
-            timestamp_line = f"{format_timestamp(start.strip())} --> {format_timestamp(end.strip())}"
-            current_segment = [timestamp_line]
+            start_time = format_timestamp(start.strip())
+            end_time = format_timestamp(end.strip())
+            out.write(f"{start_time} --> {end_time}\n")
+            
+            current_segment = {
+                'start_time': start_time,
+                'end_time': end_time,
+                'text': '',
+                'speaker': 'Speaker'
+            }
+            segments.append(current_segment)
         
-        elif line and current_segment is not None:
-            # Handle text content
-            if '<v' in line:
-                # Keep original speaker tag if present
-                current_segment.append(line)
-            else:
-                # Add default speaker tag if missing
-                current_segment.append(f"<v Speaker>{line}</v>")
-    
-    # Add the last segment
-    if current_segment:
-        cleaned_lines.extend(current_segment)
-        cleaned_lines.append('')
+        elif current_segment is not None:
+            # Handle text content, adding a default speaker tag if missing
+            if '<v' not in line:
+                line = f"<v Speaker>{line}</v>"
+            out.write(f"{line}\n")
+            
+            # Extract speaker name and text
+            match = _SPEAKER_RE.match(line)
+            if match:
+                current_segment['speaker'] = match.group(1)
+                current_segment['text'] = match.group(2).strip()
     
-    return '\n'.join(cleaned_lines)
+    return out.getvalue(), segments
 
 
 def extract_transcript_data(content):
@@ -171,11 +217,11 @@ def extract_transcript_data(content):
         if not line or line == 'WEBVTT' or is_uuid_line(line):
             continue
         
-        if '-->' in line:
+        start, sep, end = line.partition(' --> ')
+        if sep:
             if current_segment:
                 segments.append(current_segment)
             
-            start, end = line.split(' --> ')
             current_segment = {
                 'start_time': format_timestamp(start.strip()),
                 'end_time': format_timestamp(end.strip()),
@@ -184,7 +230,7 @@ def extract_transcript_data(content):
             }
         elif current_segment is not None and '<v' in line:
             # Extract speaker name and text
-            match = re.match(r'<v ([^>]+)>(.*)</v>', line)
+            match = _SPEAKER_RE.match(line)
             if match:
                 current_segment['speaker'] = match.group(1)
                 current_segment['text'] = match.group(2).strip()
@@ -215,7 +261,9 @@ def save_vtt_content(content, output_path):
 #     print(f"Saved JSON transcript to: {output_path}")
 
 
-def transcribe_video(video_file_path, output_dir="data/transcripts"):
+def transcribe_video(
+    video_file_path, output_dir="data/transcripts", metadata=None, file_stat=None
+):
     """Transcribe video using Gemini and save as VTT and JSON files."""
     try:
         # Configure Gemini
@@ -231,10 +279,13 @@ def transcribe_video(video_file_path, output_dir="data/transcripts"):
         video_file = genai.upload_file(path=video_file_path)
         print(f"Completed upload: {video_file.uri}")
 
-        # Check whether the file is ready to be used
+        # Check whether the file is ready to be used, polling with exponential
+        # backoff (1s, 2s, 4s, 8s, then every 10s) so short clips aren't held up
+        poll_delay = 1.0
         while video_file.state.name == "PROCESSING":
             print(".", end="")
-            time.sleep(10)
+            time.sleep(poll_delay)
+            poll_delay = min(poll_delay * 2, 10.0)
             video_file = genai.get_file(video_file.name)
 
         if video_file.state.name == "FAILED":
@@ -275,24 +326,21 @@ def transcribe_video(video_file_path, output_dir="data/transcripts"):
             generation_config={"temperature": 0.1}
         )
 
-        # Clean and format the content
-        formatted_content = clean_vtt_content(response.text)
-
-        # Extract transcript data
-        transcript_data = extract_transcript_data(formatted_content)
+        # Clean and format the content and extract transcript data in one pass
+        formatted_content, transcript_data = parse_and_format(response.text)
 
         # Update metadata
-        metadata = update_metadata(video_file_path, vtt_file)
+        video_metadata = update_metadata(video_file_path, vtt_file, metadata, file_stat)
 
         # Save files
         save_vtt_content(formatted_content, vtt_file)
-        # save_json_content(transcript_data, metadata, json_file)
+        # save_json_content(transcript_data, video_metadata, json_file)
 
         return vtt_file
 
     except Exception as e:
         print(f"Error transcribing video {video_file_path}: {str(e)}")
-        return None, None
+        return None
 
 
 def transcribe_videos():
@@ -306,14 +354,34 @@ def transcribe_videos():
             return
         
         print(f"Found {len(video_files)} video files.")
+
+        # Load the metadata file once; it is written back once at the end
+        metadata = load_metadata()
+        pending = []
         for video_file in video_files:
-            if should_process_video(video_file):
+            # Stat once and reuse it for both the freshness check and metadata
+            file_stat = os.stat(video_file)
+            if should_process_video(video_file, metadata, file_stat):
                 print(f"\nProcessing video: {video_file}")
-                vtt_file = transcribe_video(video_file)
-                if vtt_file:
-                    print(f"Successfully processed {video_file}")
+                pending.append((video_file, file_stat))
             else:
                 print(f"\nSkipping {video_file} - already processed")
+
+        # Overlap upload, remote processing and generation across videos
+        try:
+            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_TRANSCRIPTIONS) as executor:
+                futures = {
+                    executor.submit(
+                        transcribe_video, video_file, TRANSCRIPTS_DIR, metadata, file_stat
+                    ): video_file
+                    for video_file, file_stat in pending
+                }
+                for future in as_completed(futures):
+                    if future.result():
+                        print(f"Successfully processed {futures[future]}")
+        finally:
+            if pending:
+                save_metadata(metadata)
         
         print("\nAll videos processed successfully!")
     
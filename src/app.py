@@ -7,6 +7,7 @@ from dotenv import load_dotenv
 import time
 from concurrent.futures import ThreadPoolExecutor
 from functools import partial, lru_cache
+from operator import attrgetter
 import logging
 from generator import (
     VideoResponseGenerator,
@@ -24,6 +25,16 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Directories handed to the generator (also the cache key for get_generator)
+GENERATOR_VIDEOS_DIR = "videos"
+GENERATOR_TRANSCRIPTS_DIR = "data/transcripts"
+
+# Directory the sources dialog plays videos from
+DISPLAY_VIDEOS_DIR = "data/videos"
+
+# Sort key grouping sources by video, highest score first within each
+SOURCE_SORT_KEY = attrgetter("video", "score")
+
 # Configure Streamlit
 st.set_page_config(
     page_title="Video Q&A Assistant",
@@ -32,10 +43,11 @@ st.set_page_config(
     initial_sidebar_state="collapsed",
 )
 
-# Apply custom CSS for better UI
-st.markdown(
+# Custom CSS for better UI, with whitespace collapsed to shrink the payload
+# sent on every rerun (it cannot be skipped: Streamlit drops elements that
+# a rerun does not re-emit).
+CUSTOM_CSS = "<style>%s</style>" % " ".join(
     """
-<style>
     /* Increase dialog width */
     .stDialog > div {
         max-width: 99.5% !important;
@@ -66,19 +78,23 @@ st.markdown(
     .stSpinner > div {
         border-color: #FF4B4B !important;
     }
-</style>
-""",
-    unsafe_allow_html=True,
+"""
+    .split()
 )
 
+# Apply custom CSS for better UI
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
+
 
-@st.cache_resource()
-def get_generator() -> Optional[VideoResponseGenerator]:
-    """Initialize and cache the VideoResponseGenerator."""
+@st.cache_resource(ttl=None, show_spinner=False)
+def get_generator(
+    videos_dir: str, transcripts_dir: str
+) -> Optional[VideoResponseGenerator]:
+    """Initialize and cache the VideoResponseGenerator per directory pair."""
     try:
         return VideoResponseGenerator(
-            videos_dir="videos",
-            transcripts_dir="data/transcripts",
+            videos_dir=videos_dir,
+            transcripts_dir=transcripts_dir,
             provider="azure"
         )
     except Exception as e:
@@ -92,8 +108,17 @@ def get_video_title(video_filename: str) -> str:
     return os.path.splitext(video_filename)[0].replace("_", " ").title()
 
 
-def parse_timestamp(timestamp: str) -> int:
-    """Parse timestamp string to seconds."""
+def parse_timestamp(timestamp) -> int:
+    """Parse timestamp to seconds."""
+    # Already-numeric values need no parsing (and no cache entry)
+    if isinstance(timestamp, (int, float)):
+        return int(timestamp)
+    return _parse_timestamp_str(str(timestamp))
+
+
+@lru_cache(maxsize=4096)
+def _parse_timestamp_str(timestamp: str) -> int:
+    """Parse timestamp string to seconds (memoized, timestamps recur across reruns)."""
     try:
         if ":" in timestamp:
             parts = timestamp.split(":")
@@ -112,34 +137,41 @@ def parse_timestamp(timestamp: str) -> int:
 def filter_top_k_per_video(
     sources, display_k: int = config.display_sources["display_k"]
 ):
-    """Filter and return top k sources per video based on score."""
-    video_groups = defaultdict(list)
-    for source in sources:
-        video_groups[source.video].append(source)
+    """
+    Filter and return top k sources per video based on score.
 
+    Expects sources already sorted by (video, score) in descending order, as
+    get_display_sources provides them, so the first display_k seen for each
+    video are its highest scoring ones.
+    """
+    counts = defaultdict(int)
     filtered_sources = []
-    for video, segments in video_groups.items():
-        # Sort by score in descending order (higher scores first)
-        top_k = sorted(segments, key=lambda x: x.score, reverse=True)[:display_k]
-        filtered_sources.extend(top_k)
+    for source in sources:
+        if counts[source.video] < display_k:
+            filtered_sources.append(source)
+            counts[source.video] += 1
 
     return filtered_sources
 
 
-# Filter top k sources per video
+def get_display_sources(message: Dict) -> List[VideoSegment]:
+    """Return the top k sources per video for a chat message, computed once per message."""
+    if "_display_sources" not in message:
+        # Filter sources to be taken from one file only with high score
+        sources = sorted(message["sources"], key=SOURCE_SORT_KEY, reverse=True)
+        message["_display_sources"] = filter_top_k_per_video(
+            sources, display_k=config.display_sources["display_k"]
+        )
+    return message["_display_sources"]
+
+
 @st.dialog("Video Sources", width="large")
-def show_sources(sources: List[VideoSegment]):
-    """Display video sources in an optimized dialog."""
-    if not sources:
+def show_sources(top_k_sources: List[VideoSegment]):
+    """Display pre-filtered video sources in an optimized dialog."""
+    if not top_k_sources:
         st.warning("No relevant video sources found.")
         return
 
-    # Filter sources to be taken from one file only with high score
-    sources = sorted(sources, key=lambda x: (x.video, x.score), reverse=True)
-    top_k_sources = filter_top_k_per_video(
-        sources, display_k=config.display_sources["display_k"]
-    )
-
     # Display videos in grid
     cols_per_row = min(2, len(top_k_sources))
     if cols_per_row > 0:
@@ -148,18 +180,19 @@ def show_sources(sources: List[VideoSegment]):
         for idx, source in enumerate(top_k_sources):
             with cols[idx % cols_per_row]:
                 try:
-                    video_path = Path("data/videos") / source.video
-                    video_file = open(video_path, "rb")
-                    video_bytes = video_file.read()
-
-                    if not video_path.exists():
+                    video_path = os.path.join(DISPLAY_VIDEOS_DIR, source.video)
+                    if not os.path.exists(video_path):
                         st.error(f"Video file not found: {source.video}")
                         continue
 
+                    # Let Streamlit serve the file from disk instead of
+                    # reading the whole video into memory on every rerun
+                    # Pass seconds from the memoized parser rather than
+                    # letting Streamlit re-parse the strings on every rerun
                     st.video(
-                        video_bytes,
-                        start_time=source.timestamp.start,
-                        end_time=source.timestamp.end,
+                        video_path,
+                        start_time=parse_timestamp(source.timestamp.start),
+                        end_time=parse_timestamp(source.timestamp.end),
                     )
                     # Get title from metadata or format filename
                     title = get_video_title(source.video)
@@ -209,9 +242,9 @@ def main():
                 and message["sources"]
                 and message["content"] != "I don't have enough information."
             ):
+                # No st.rerun() needed: the dialog check below runs in this same pass
                 if st.button("Show Sources", key=f"source_btn_{idx}"):
-                    st.session_state.show_sources = message["sources"]
-                    st.rerun()
+                    st.session_state.show_sources = get_display_sources(message)
 
     # Show sources dialog if needed
     if st.session_state.show_sources is not None:
@@ -223,7 +256,7 @@ def main():
         return
 
     # Initialize generator
-    generator = get_generator()
+    generator = get_generator(GENERATOR_VIDEOS_DIR, GENERATOR_TRANSCRIPTS_DIR)
     if generator is None:
         st.error("⚠️ System initialization failed. Please check configuration.")
         return
@@ -267,14 +300,13 @@ def main():
                 st.markdown(message_content)
 
                 # Save message to history
-                st.session_state.messages.append(
-                    {
-                        "role": "assistant",
-                        "content": message_content,
-                        "sources": response.sources if not response.has_error else [],
-                        # "response_time": response_time
-                    }
-                )
+                assistant_message = {
+                    "role": "assistant",
+                    "content": message_content,
+                    "sources": response.sources if not response.has_error else [],
+                    # "response_time": response_time
+                }
+                st.session_state.messages.append(assistant_message)
 
                 # Show sources button
                 if (
@@ -282,7 +314,9 @@ def main():
                     and message_content != "I don't have enough information."
                 ):
                     if st.button("Show Sources", key="source_btn_current"):
-                        st.session_state.show_sources = response.sources
+                        st.session_state.show_sources = get_display_sources(
+                            assistant_message
+                        )
                         st.rerun()
 
             except Exception as e:
@@ -4,15 +4,11 @@ Configuration loader for the RAG Video Transcription application.
 import json
 from pathlib import Path
 from typing import Dict, Any
+from config_utils import config as app_config
 
 def load_config() -> Dict[str, Any]:
-    """Load configuration from config.json file."""
-    config_path = Path(__file__).parent.parent / "config" / "config.json"
-    try:
-        with open(config_path) as f:
-            return json.load(f)
-    except Exception as e:
-        raise RuntimeError(f"Failed to load config: {e}")
+    """Load configuration from config.json file (shared with config_utils)."""
+    return app_config.data
 
 # Global config instance
 CONFIG = load_config()
@@ -54,6 +50,7 @@ class Config:
         
         # Load metadata
         self.metadata = self.load_metadata()
+        self._build_metadata_index()
         
         # Elasticsearch settings
         self.es_config = {
@@ -70,6 +67,17 @@ class Config:
                 return json.load(f)
         return {"transcript_metadata": []}
     
+    def _build_metadata_index(self) -> None:
+        """Index transcript metadata entries by video path for O(1) lookups"""
+        self._by_path = {}
+        for item in self.metadata.get("transcript_metadata", []):
+            # Extractor bookkeeping entries ({"metadata": {...}}) have no path
+            video_path = item.get("video_path")
+            if video_path is None:
+                continue
+            # Keep the first entry per video, matching the old linear scan
+            self._by_path.setdefault(video_path, item)
+    
     def save_metadata(self, metadata: Dict) -> None:
         """Save metadata to index_metadata.json"""
         with open(self.metadata_file, 'w') as f:
@@ -77,21 +85,21 @@ class Config:
     
     def get_video_metadata(self, video_path: str) -> Optional[Dict]:
         """Get metadata for a specific video"""
-        for item in self.metadata.get("transcript_metadata", []):
-            if item["video_path"] == video_path:
-                return item
-        return None
+        return self._by_path.get(video_path)
     
     def update_video_metadata(self, video_path: str, metadata: Dict) -> None:
         """Update metadata for a specific video"""
-        for item in self.metadata.get("transcript_metadata", []):
-            if item["video_path"] == video_path:
-                item.update(metadata)
-                break
+        item = self._by_path.get(video_path)
+        if item is not None:
+            item.update(metadata)
         else:
             if "transcript_metadata" not in self.metadata:
                 self.metadata["transcript_metadata"] = []
             self.metadata["transcript_metadata"].append(metadata)
+            # Index the new entry under its own path, as lookups match it
+            new_path = metadata.get("video_path")
+            if new_path is not None:
+                self._by_path.setdefault(new_path, metadata)
         
         self.save_metadata(self.metadata)
 
@@ -20,6 +20,10 @@ class Config:
         except Exception as e:
             raise Exception(f"Error loading config file: {str(e)}")
 
+    @property
+    def data(self) -> Dict[str, Any]:
+        return self._config
+
     @property
     def models(self) -> Dict[str, str]:
         return self._config["models"]
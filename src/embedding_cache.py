@@ -0,0 +1,186 @@
+"""
+Caching wrapper around an embeddings model.
+"""
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that memoizes query embeddings in an in-memory LRU and,
+    optionally, document embeddings in a SQLite file that survives restarts.
+    """
+
+    # Hashes per SELECT ... IN (...), below SQLite's bound-parameter limit
+    LOOKUP_CHUNK_SIZE = 500
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        max_queries: int = 1000,
+        cache_path: Optional[str] = None,
+        model_name: str = "",
+    ):
+        """
+        Wrap an embeddings model.
+
+        Args:
+            inner: Embeddings model that computes uncached vectors
+            max_queries: Maximum number of query embeddings kept in memory
+            cache_path: SQLite file for document embeddings (None disables it)
+            model_name: Model identifier mixed into the cache key, so vectors
+                from a different model or dimension are never reused
+        """
+        self.inner = inner
+        self.max_queries = max_queries
+        self.model_name = model_name
+        self._queries: "OrderedDict[bytes, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if cache_path:
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+            # Shared across threads; every access goes through self._lock
+            self._db = sqlite3.connect(cache_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (hash BLOB PRIMARY KEY, vec BLOB)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.sha256(text.encode("utf-8")).digest()
+
+    def _document_key(self, text: str) -> bytes:
+        """
+        Hash the model name with whitespace-normalized text.
+
+        Only runs of whitespace are collapsed. Case and punctuation are kept
+        because they can change meaning ("US" vs "us", "C" vs "C++") and a
+        key hit is served without any further check.
+        """
+        normalized = " ".join(text.split())
+        return self._key(f"{self.model_name}\0{normalized}")
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query, reusing the vector for an identical earlier query."""
+        key = self._key(text)
+        with self._lock:
+            vector = self._queries.get(key)
+            if vector is not None:
+                self._queries.move_to_end(key)
+                return vector
+
+        vector = self.inner.embed_query(text)
+
+        with self._lock:
+            self._queries[key] = vector
+            self._queries.move_to_end(key)
+            while len(self._queries) > self.max_queries:
+                self._queries.popitem(last=False)
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed several queries, reusing cached query vectors like embed_query.
+
+        Missing queries are embedded in one request and added to the
+        in-memory query cache; none of them are written to the document cache.
+        """
+        keys = [self._key(text) for text in texts]
+        vectors: Dict[bytes, List[float]] = {}
+        with self._lock:
+            for key in keys:
+                vector = self._queries.get(key)
+                if vector is not None:
+                    self._queries.move_to_end(key)
+                    vectors[key] = vector
+
+        # Embed each distinct missing query once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors and key not in missing:
+                missing[key] = text
+
+        if missing:
+            computed = dict(zip(missing, self.inner.embed_documents(list(missing.values()))))
+            vectors.update(computed)
+            with self._lock:
+                for key, vector in computed.items():
+                    self._queries[key] = vector
+                    self._queries.move_to_end(key)
+                while len(self._queries) > self.max_queries:
+                    self._queries.popitem(last=False)
+        return [vectors[key] for key in keys]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents, only sending texts missing from the disk cache to the model."""
+        if self._db is None:
+            return self.inner.embed_documents(texts)
+
+        keys = [self._document_key(text) for text in texts]
+        cached = self._load_vectors(keys)
+
+        # Embed each distinct missing text once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            vectors = self.inner.embed_documents(list(missing.values()))
+            # Return the float16 values that are stored, so a text gets the
+            # same vector whether or not it was cached
+            computed = {
+                key: np.asarray(vector, dtype=np.float16).astype(float).tolist()
+                for key, vector in zip(missing, vectors)
+            }
+            self._store_vectors(computed)
+            cached.update(computed)
+
+        with self._lock:
+            self._hits += len(texts) - len(missing)
+            self._misses += len(missing)
+        return [cached[key] for key in keys]
+
+    def _load_vectors(self, keys: List[bytes]) -> Dict[bytes, List[float]]:
+        """Fetch cached vectors for the given keys."""
+        found = {}
+        unique_keys = list(dict.fromkeys(keys))
+        with self._lock:
+            for i in range(0, len(unique_keys), self.LOOKUP_CHUNK_SIZE):
+                chunk = unique_keys[i : i + self.LOOKUP_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE hash IN ({placeholders})",
+                    chunk,
+                )
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float16).astype(float).tolist()
+        return found
+
+    def _store_vectors(self, vectors: Dict[bytes, List[float]]) -> None:
+        """Persist vectors as float16 blobs, half the size of float32."""
+        rows = [
+            (key, np.asarray(vector, dtype=np.float16).tobytes())
+            for key, vector in vectors.items()
+        ]
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO embeddings (hash, vec) VALUES (?, ?)", rows
+            )
+            self._db.commit()
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Return document cache hit and miss counts since creation."""
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses}
@@ -1,20 +1,31 @@
 from dataclasses import dataclass, field
 from typing import List, Dict, Optional, Tuple
 import os
+import sys
+import json
+import asyncio
+import logging
 import openai
 from pathlib import Path
 from functools import lru_cache
 from dotenv import load_dotenv
 from openai import OpenAI
 from openai import AzureOpenAI
+from openai import AsyncOpenAI, AsyncAzureOpenAI
 from retriever import VideoRetriever
+from semantic_cache import SemanticCache
 import time
 from config_utils import config
 
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_SLOTS)
 class VideoTimestamp:
     """Immutable data class for video timestamps."""
     start: str
@@ -24,7 +35,7 @@ class VideoTimestamp:
         return f"{self.start} - {self.end}"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, **_SLOTS)
 class VideoSegment:
     """Immutable data class for video segments."""
     text: str
@@ -61,7 +72,7 @@ class VideoSegment:
         }
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class SearchResponse:
     """Data class for search responses."""
     answer: str
@@ -89,6 +100,10 @@ class VideoResponseGenerator:
     MIN_QUERY_LENGTH = 3
     MAX_QUERY_LENGTH = 500
     DEFAULT_SEARCH_LIMIT = config.retrieval["max_sources"]
+    SEMANTIC_CACHE_THRESHOLD = config.retrieval.get("semantic_cache_threshold", 0.92)
+    SEMANTIC_CACHE_SIZE = config.retrieval.get("semantic_cache_size", 256)
+    BATCH_POLL_INTERVAL = 30  # Seconds between Batch API status checks
+    BATCH_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
 
     def __init__(
         self,
@@ -111,6 +126,13 @@ class VideoResponseGenerator:
         self.high_confidence_threshold = high_confidence_threshold
         self._init_retriever(videos_dir, transcripts_dir)
         self._init_client()
+        # Answers for recent questions, reused for near-identical rephrasings
+        # until the index changes
+        self.semantic_cache = SemanticCache(
+            threshold=self.SEMANTIC_CACHE_THRESHOLD,
+            max_entries=self.SEMANTIC_CACHE_SIZE,
+        )
+        self._cache_generation = self.retriever.index_generation
 
     def _init_retriever(self, videos_dir: str, transcripts_dir: str) -> None:
         """Initialize the video retriever with error handling."""
@@ -139,6 +161,10 @@ class VideoResponseGenerator:
                     azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
                     api_key=os.environ["AZURE_OPENAI_API_KEY"]
                 )
+                self.aclient = AsyncAzureOpenAI(
+                    azure_endpoint=os.environ["AZURE_OPENAI_ENDPOINT"],
+                    api_key=os.environ["AZURE_OPENAI_API_KEY"]
+                )
 
             except Exception as e:
                 raise VideoResponseError(
@@ -156,6 +182,7 @@ class VideoResponseGenerator:
 
             try:
                 self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+                self.aclient = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
                 self.model = "gpt-4"  # Default model, can be made configurable
             except Exception as e:
                 raise VideoResponseError(
@@ -166,36 +193,148 @@ class VideoResponseGenerator:
         """Validate the search query."""
         if not isinstance(query, str):
             raise ValueError("Query must be a string")
-        if len(query.strip()) < self.MIN_QUERY_LENGTH:
+        length = len(query)
+        # Only copy the string via strip() when it has outer whitespace
+        if length and not query[0].isspace() and not query[-1].isspace():
+            stripped_length = length
+        else:
+            stripped_length = len(query.strip())
+        if stripped_length < self.MIN_QUERY_LENGTH:
             raise ValueError(
                 f"Query must be at least {self.MIN_QUERY_LENGTH} characters"
             )
-        if len(query) > self.MAX_QUERY_LENGTH:
+        if length > self.MAX_QUERY_LENGTH:
             raise ValueError(
                 f"Query must not exceed {self.MAX_QUERY_LENGTH} characters"
             )
 
-    def _format_context(self, segments: Tuple[VideoSegment, ...]) -> str:
-        """Format video segments into a context string."""
+    def _format_context(self, segments: List[Dict]) -> str:
+        """Format video segments, already ordered by score, into a context string."""
         return "\n\n".join(
-            f"From video {segment['video']} ({segment['timestamp']}):\n{segment['text']}"
+            f"From video {segment['video']} "
+            f"({segment['timestamp']['start']} - {segment['timestamp']['end']}):\n"
+            f"{segment['text']}"
             for segment in segments
         )
 
     def _display_segments(self, segments: List[Dict]) -> None:
-        """Display relevant segments if any are found."""
+        """Log relevant segments at debug level, if any are found."""
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
         if segments:
-            print("\nRelevant segments found:")
+            logger.debug("Relevant segments found: %d", len(segments))
             for i, segment in enumerate(segments, 1):
-                print(f"\n{i}. Video: {segment.get('video', 'Unknown')}")
                 timestamp = segment.get("timestamp", {})
-                print(
-                    f"   Timestamp: {timestamp.get('start', 'N/A')} - {timestamp.get('end', 'N/A')}"
+                logger.debug(
+                    "%d. Video: %s | Timestamp: %s - %s | Confidence Score: %.4f | Text: %s",
+                    i,
+                    segment.get("video", "Unknown"),
+                    timestamp.get("start", "N/A"),
+                    timestamp.get("end", "N/A"),
+                    segment.get("score", 0),
+                    segment.get("text", "No text available"),
                 )
-                print(f"   Text: {segment.get('text', 'No text available')}")
-                print(f"   Confidence Score: {segment.get('score', 0):.4f}")
         else:
-            print("\nNo relevant segments found.")
+            logger.debug("No relevant segments found.")
+
+    def _create_messages(self, query: str, context: str) -> List[Dict[str, str]]:
+        """Create chat completion messages for a query and its context."""
+        return [
+            {
+                "role": "system",
+                "content": (
+                    "You are a helpful assistant that answers questions about videos "
+                    "based on their transcripts. Use the provided video segments to "
+                    "answer the question. If you're not sure about something, say so "
+                    "rather than making things up."
+                ),
+            },
+            {
+                "role": "user",
+                "content": f"Context from video transcripts:\n{context}\n\nQuestion: {query}",
+            },
+        ]
+
+    def _lookup_cache(self, query: str) -> Tuple[Optional[Tuple], List[float], int]:
+        """
+        Validate and embed the query.
+
+        Returns:
+            Any cached (answer, segments), the embedding, and the index
+            generation the lookup saw (to pass back to _cache_answer)
+        """
+        self._validate_query(query)
+        generation = self.retriever.index_generation
+        if generation != self._cache_generation:
+            # Segments were indexed, updated or deleted since these answers
+            # were cached, so their sources may no longer exist
+            self.semantic_cache.clear()
+            self._cache_generation = generation
+        query_vector = self.retriever.embed_query(query)
+        return self.semantic_cache.get(query_vector), query_vector, generation
+
+    def _cache_answer(
+        self,
+        query: str,
+        query_vector: List[float],
+        generation: int,
+        answer: str,
+        segments: List[Dict],
+    ) -> None:
+        """Cache an answer unless the index changed while it was generated."""
+        if generation == self.retriever.index_generation:
+            self.semantic_cache.put(query_vector, (answer, segments))
+
+    def _prepare_query(
+        self, query: str, query_vector: Optional[List[float]] = None
+    ) -> Tuple[List[Dict], Optional[List[Dict]]]:
+        """Retrieve segments for the query; messages are None if nothing matched."""
+        segments = self.retriever.search(query, query_vector=query_vector)
+
+        if not segments:
+            return segments, None
+
+        self._display_segments(segments)
+        context = self._format_context(segments)
+        return segments, self._create_messages(query, context)
+
+    def _completion_params(self, messages: List[Dict[str, str]]) -> Dict:
+        """Build the chat completion request shared by the sync and async clients."""
+        return {
+            "model": "gpt-4",
+            "messages": messages,
+            "temperature": self.TEMPERATURE,
+            "max_tokens": self.MAX_TOKENS,
+        }
+
+    @staticmethod
+    def _no_results_response() -> SearchResponse:
+        return SearchResponse(
+            answer="I couldn't find any relevant information in the video transcripts to answer your question.",
+            sources=[],
+        )
+
+    @staticmethod
+    def _build_response(answer: str, segments: List[Dict], k: int) -> SearchResponse:
+        # VideoRetriever.search returns segments sorted by score
+        # (highest first), so the top k are simply the first k
+        return SearchResponse(
+            answer=answer.strip(),
+            sources=[VideoSegment.from_dict(s) for s in segments[:k]],
+        )
+
+    @staticmethod
+    def _error_response(error: Exception) -> SearchResponse:
+        if isinstance(error, (ValueError, TypeError)):
+            return SearchResponse(
+                answer="I encountered an error while processing your question.",
+                error=str(error),
+            )
+        logger.error("Unexpected error generating response", exc_info=error)
+        return SearchResponse(
+            answer="I encountered an unexpected error while processing your question.",
+            error=str(error),
+        )
 
     def generate_response(
         self,
@@ -205,61 +344,182 @@ class VideoResponseGenerator:
     ) -> SearchResponse:
         """Generate a response to a video-related query using OpenAI."""
         try:
-            self._validate_query(query)
-            segments = self.retriever.search(query)
+            cached, query_vector, generation = self._lookup_cache(query)
+            if cached is not None:
+                return self._build_response(*cached, k)
 
-            if not segments:
-                return SearchResponse(
-                    answer="I couldn't find any relevant information in the video transcripts to answer your question.",
-                    sources=[],
-                )
-
-            self._display_segments(segments)
-            context = self._format_context(tuple(segments))
-
-            # Create chat completion messages
-            messages = [
-                {
-                    "role": "system",
-                    "content": (
-                        "You are a helpful assistant that answers questions about videos "
-                        "based on their transcripts. Use the provided video segments to "
-                        "answer the question. If you're not sure about something, say so "
-                        "rather than making things up."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": f"Context from video transcripts:\n{context}\n\nQuestion: {query}",
-                },
-            ]
+            segments, messages = self._prepare_query(query, query_vector)
+            if messages is None:
+                return self._no_results_response()
 
             try:
                 # Generate response using the appropriate client
                 response = self.client.chat.completions.create(
-                    model="gpt-4",
-                    messages=messages,
-                    temperature=self.TEMPERATURE,
-                    max_tokens=self.MAX_TOKENS,
+                    **self._completion_params(messages)
                 )
+                answer = response.choices[0].message.content
+                self._cache_answer(query, query_vector, generation, answer, segments)
+                return self._build_response(answer, segments, k)
+            except Exception as e:
+                raise VideoResponseError(f"Failed to generate response: {str(e)}")
+
+        except Exception as e:
+            return self._error_response(e)
+
+    async def agenerate_response(
+        self,
+        query: str,
+        k: int = DEFAULT_SEARCH_LIMIT,
+        score_threshold: float = None,
+    ) -> SearchResponse:
+        """Async variant of generate_response using the async OpenAI client."""
+        try:
+            # Embedding and retrieval are synchronous, run them off the event loop
+            loop = asyncio.get_running_loop()
+            cached, query_vector, generation = await loop.run_in_executor(
+                None, self._lookup_cache, query
+            )
+            if cached is not None:
+                return self._build_response(*cached, k)
+
+            segments, messages = await loop.run_in_executor(
+                None, self._prepare_query, query, query_vector
+            )
+            if messages is None:
+                return self._no_results_response()
 
-                return SearchResponse(
-                    answer=response.choices[0].message.content.strip(),
-                    sources=sorted(segments, key=lambda x: x.score, reverse=True)[:k],
+            try:
+                response = await self.aclient.chat.completions.create(
+                    **self._completion_params(messages)
                 )
+                answer = response.choices[0].message.content
+                self._cache_answer(query, query_vector, generation, answer, segments)
+                return self._build_response(answer, segments, k)
             except Exception as e:
                 raise VideoResponseError(f"Failed to generate response: {str(e)}")
 
-        except (ValueError, TypeError) as e:
-            return SearchResponse(
-                answer="I encountered an error while processing your question.",
-                error=str(e),
-            )
         except Exception as e:
-            return SearchResponse(
-                answer="I encountered an unexpected error while processing your question.",
-                error=str(e),
-            )
+            return self._error_response(e)
+
+    async def generate_many(
+        self, queries: List[str], k: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[SearchResponse]:
+        """
+        Generate responses for several queries concurrently.
+
+        Args:
+            queries: Questions to answer
+            k: Number of sources to keep per response
+
+        Returns:
+            One SearchResponse per query, in the same order
+        """
+        return await asyncio.gather(
+            *(self.agenerate_response(query, k) for query in queries)
+        )
+
+    def generate_many_sync(
+        self, queries: List[str], k: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[SearchResponse]:
+        """Blocking wrapper around generate_many for scripts without an event loop."""
+        return asyncio.run(self.generate_many(queries, k))
+
+    def generate_batch(
+        self, queries: List[str], k: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[SearchResponse]:
+        """
+        Answer many queries through the Batch API, for offline evaluation runs.
+
+        Retrieval runs immediately; the chat completions are submitted as one
+        batch job, which is billed at a discount but may take up to 24 hours.
+        This call blocks, polling until the job finishes.
+
+        Args:
+            queries: Questions to answer
+            k: Number of sources to keep per response
+
+        Returns:
+            One SearchResponse per query, in the same order
+        """
+        responses: List[Optional[SearchResponse]] = [None] * len(queries)
+        pending = {}  # custom_id -> (index, query, query_vector, generation, segments)
+        lines = []
+        # Azure's batch endpoint has no /v1 prefix
+        url = "/chat/completions" if self.provider == "azure" else "/v1/chat/completions"
+
+        for i, query in enumerate(queries):
+            try:
+                cached, query_vector, generation = self._lookup_cache(query)
+                if cached is not None:
+                    responses[i] = self._build_response(*cached, k)
+                    continue
+
+                segments, messages = self._prepare_query(query, query_vector)
+                if messages is None:
+                    responses[i] = self._no_results_response()
+                    continue
+
+                custom_id = f"query-{i}"
+                pending[custom_id] = (i, query, query_vector, generation, segments)
+                lines.append(json.dumps({
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": url,
+                    "body": self._completion_params(messages),
+                }))
+            except Exception as e:
+                responses[i] = self._error_response(e)
+
+        if pending:
+            try:
+                answers = self._run_batch("\n".join(lines).encode("utf-8"), url)
+            except Exception as e:
+                error = VideoResponseError(f"Failed to generate batch responses: {str(e)}")
+                answers = {}
+            else:
+                error = VideoResponseError("No batch result returned for query")
+
+            for custom_id, (i, query, query_vector, generation, segments) in pending.items():
+                answer = answers.get(custom_id)
+                if answer is None:
+                    responses[i] = self._error_response(error)
+                    continue
+                self._cache_answer(query, query_vector, generation, answer, segments)
+                responses[i] = self._build_response(answer, segments, k)
+
+        return responses
+
+    def _run_batch(self, jsonl: bytes, endpoint: str) -> Dict[str, str]:
+        """Submit a JSONL batch, wait for it, and return answers keyed by custom_id."""
+        input_file = self.client.files.create(
+            file=("batch.jsonl", jsonl), purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=endpoint,
+            completion_window="24h",
+        )
+        while batch.status not in self.BATCH_FINAL_STATUSES:
+            time.sleep(self.BATCH_POLL_INTERVAL)
+            batch = self.client.batches.retrieve(batch.id)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            raise VideoResponseError(f"Batch {batch.id} ended with status {batch.status}")
+
+        answers = {}
+        output = self.client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") != 200:
+                logger.warning(
+                    "Batch request %s failed: %s", result.get("custom_id"), result.get("error")
+                )
+                continue
+            answers[result["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+        return answers
 
 
 def display_response(response: SearchResponse) -> None:
@@ -3,11 +3,14 @@ Video Retrieval Interface using VideoTranscriptionStore
 """
 from typing import List, Dict, Optional
 from datetime import datetime
+import logging
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 from vector_store import VideoTranscriptionStore
 
+logger = logging.getLogger(__name__)
+
 load_dotenv()
 
 
@@ -33,6 +36,15 @@ class VideoRetriever:
         # if api_key:
         #     self.store.init_transcriber(api_key)
 
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query with the same model used for transcript segments."""
+        return self.store.embeddings.embed_query(query)
+
+    @property
+    def index_generation(self) -> int:
+        """Counter the store increments on every write to the index."""
+        return self.store.generation
+
     def parse_timestamp(self, time_val: str) -> float:
         """Parse timestamp to seconds."""
         try:
@@ -65,15 +77,30 @@ class VideoRetriever:
         except:
             return "00:00:00"
 
+    def _display_timestamp(self, time_val) -> str:
+        """Return a stored timestamp string unchanged, formatting anything else."""
+        if isinstance(time_val, str):
+            return time_val
+        return self.format_timestamp(time_val)
+
     def format_result(self, result: Dict) -> Dict:
         """Format search result for display."""
         try:
             # Extract metadata
             metadata = result.get("metadata", {})
 
-            # Get timestamps
-            start_time = result.get("start_time", metadata.get("start_time", 0))
-            end_time = result.get("end_time", metadata.get("end_time", 0))
+            # Get timestamps, only consulting metadata when the result lacks them
+            start_time = result.get("start_time")
+            if start_time is None:
+                start_time = metadata.get("start_time", 0)
+            end_time = result.get("end_time")
+            if end_time is None:
+                end_time = metadata.get("end_time")
+
+            # Timestamps are stored at ingest as VTT "HH:MM:SS.mmm" strings and
+            # used as-is; only legacy numeric values are formatted here
+            start = self._display_timestamp(start_time)
+            end = start if end_time is None else self._display_timestamp(end_time)
 
             # Format result
             formatted = {
@@ -81,10 +108,7 @@ class VideoRetriever:
                 "video": result.get(
                     "video_filename", metadata.get("video_filename", "")
                 ),
-                "timestamp": {
-                    "start": self.format_timestamp(start_time),
-                    "end": self.format_timestamp(end_time),
-                },
+                "timestamp": {"start": start, "end": end},
                 "score": float(result.get("score", 0)),
                 "metadata": metadata,
             }
@@ -95,11 +119,15 @@ class VideoRetriever:
 
             return formatted
         except Exception as e:
-            print(f"Error formatting result: {e}")
+            logger.exception("Error formatting result")
             return None
 
     def search(
-        self, query: str, k: int = 5, score_threshold: float = 0.60  # Lowered threshold
+        self,
+        query: str,
+        k: int = 5,
+        score_threshold: float = 0.60,  # Lowered threshold
+        query_vector: Optional[List[float]] = None,
     ) -> List[Dict]:
         """
         Search for video segments matching query.
@@ -108,28 +136,27 @@ class VideoRetriever:
             query: Search query
             k: Number of results to return
             score_threshold: Minimum similarity score threshold (default: 0.60)
+            query_vector: Precomputed embedding of the query (from embed_query),
+                so the query is not embedded a second time
 
         Returns:
             List of relevant video segments with metadata
         """
         try:
-            print(f"\nSearching for query: {query}")
-            print(f"Score threshold: {score_threshold}")
+            logger.debug("Searching for query: %s (score threshold %s)", query, score_threshold)
             
             # Get results from vector store
-            results = self.store.search_transcriptions(
-                query=query, k=k, score_threshold=score_threshold
-            )
-
-            print(f"Number of raw results: {len(results)}")
-            
-            if not results:
-                print(f"No results found with similarity score >= {score_threshold}")
-                return []
-
-            # Format results with deduplication
+            if query_vector is not None:
+                results = self.store.search_by_vector(
+                    query_vector, k=k, score_threshold=score_threshold
+                )
+            else:
+                results = self.store.search_transcriptions(
+                    query=query, k=k, score_threshold=score_threshold
+                )
+
+            # Format results with deduplication as the store yields them
             seen_texts = {}  # Track unique texts with their highest scores
-            formatted_results = []
 
             for result in results:
                 # Format the result
@@ -140,29 +167,29 @@ class VideoRetriever:
                 # Check for duplicate text
                 text = formatted["text"].strip().lower()
                 
-                print(f"\nResult found:")
-                print(f"Text: {text[:100]}...")  # Print first 100 chars
-                print(f"Score: {formatted['score']}")
-                print(f"Video: {formatted.get('video_filename', 'N/A')}")
+                logger.debug(
+                    "Result found: text=%.100s score=%s video=%s",
+                    text, formatted["score"], formatted.get("video", "N/A"),
+                )
 
                 # If we've seen this text before, only keep the one with higher score
-                if text in seen_texts:
-                    if formatted["score"] > seen_texts[text]["score"]:
-                        # Remove the lower scored duplicate
-                        formatted_results.remove(seen_texts[text])
-                        formatted_results.append(formatted)
-                        seen_texts[text] = formatted
-                else:
-                    formatted_results.append(formatted)
+                best = seen_texts.get(text)
+                if best is None or formatted["score"] > best["score"]:
                     seen_texts[text] = formatted
 
+            if not seen_texts:
+                logger.debug("No results found with similarity score >= %s", score_threshold)
+                return []
+
             # Sort by score in descending order
-            formatted_results.sort(key=lambda x: x["score"], reverse=True)
-            print(f"\nFinal number of deduplicated results: {len(formatted_results)}")
+            formatted_results = sorted(
+                seen_texts.values(), key=lambda x: x["score"], reverse=True
+            )
+            logger.debug("Final number of deduplicated results: %d", len(formatted_results))
             return formatted_results
 
         except Exception as e:
-            print(f"Search error: {e}")
+            logger.exception("Search error for query %r", query)
             return []
 
     def process_video(self, video_filename: str) -> None:
@@ -170,14 +197,14 @@ class VideoRetriever:
         try:
             self.store.upsert_video(video_filename)
         except Exception as e:
-            print(f"Error processing video {video_filename}: {e}")
+            logger.exception("Error processing video %s", video_filename)
 
     def process_all_videos(self) -> None:
         """Process all videos in the videos directory."""
         try:
             self.store.upsert_all_videos()
         except Exception as e:
-            print(f"Error processing videos: {e}")
+            logger.exception("Error processing videos")
 
 
 def main():
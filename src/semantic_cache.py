@@ -0,0 +1,100 @@
+"""
+Semantic cache mapping recent query embeddings to previously computed results.
+"""
+import threading
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """In-memory cache of query embeddings matched by cosine similarity."""
+
+    def __init__(self, threshold: float = 0.92, max_entries: int = 256):
+        """
+        Initialize an empty cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a cached query to count as a hit
+            max_entries: Maximum number of cached queries (oldest are evicted first)
+        """
+        if not 0 <= threshold <= 1:
+            raise ValueError("Cache threshold must be between 0 and 1")
+        if max_entries < 1:
+            raise ValueError("Cache size must be at least 1")
+
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._matrix: Optional[np.ndarray] = None  # (N, d) L2-normalized rows
+        self._key_ids: Optional[np.ndarray] = None  # (N,) id of each row's key
+        self._ids: Dict[Hashable, int] = {}  # Live keys -> ids
+        self._values: List[Any] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        """Return the vector as a unit-length float32 array."""
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def get(self, vector: List[float], key: Hashable = None) -> Optional[Any]:
+        """
+        Return the value cached for the most similar query, or None on a miss.
+
+        Only entries put with an equal key are considered, so values computed
+        with different parameters for the same query are told apart.
+        """
+        qvec = self._normalize(vector)
+        with self._lock:
+            key_id = self._ids.get(key)
+            if (
+                key_id is None
+                or self._matrix is None
+                or self._matrix.shape[1] != qvec.shape[0]
+            ):
+                return None
+            # One matrix-vector product scores every cached query
+            scores = np.where(self._key_ids == key_id, self._matrix @ qvec, -np.inf)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return self._values[best]
+        return None
+
+    def put(self, vector: List[float], value: Any, key: Hashable = None) -> None:
+        """Cache a value under the query's embedding and key."""
+        qvec = self._normalize(vector)[np.newaxis, :]
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != qvec.shape[1]:
+                self._ids = {key: 0}
+                self._matrix = qvec
+                self._key_ids = np.zeros(1, dtype=np.int64)
+                self._values = [value]
+                return
+
+            key_id = self._ids.get(key)
+            if key_id is None:
+                key_id = self._ids[key] = int(self._key_ids.max()) + 1
+            self._matrix = np.vstack([self._matrix, qvec])
+            self._key_ids = np.append(self._key_ids, key_id)
+            self._values.append(value)
+
+            # Evict the oldest entries beyond capacity
+            overflow = len(self._values) - self.max_entries
+            if overflow > 0:
+                self._matrix = self._matrix[overflow:]
+                self._key_ids = self._key_ids[overflow:]
+                del self._values[:overflow]
+                live = set(self._key_ids.tolist())
+                self._ids = {k: i for k, i in self._ids.items() if i in live}
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._matrix = None
+            self._key_ids = None
+            self._ids = {}
+            self._values = []
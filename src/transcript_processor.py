@@ -1,13 +1,52 @@
 import os
 import re
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from datetime import datetime
 import webvtt
 from pathlib import Path
 from config import config
 
+# Patterns compiled once at import
+# Transcript filename timestamp, format: filename_YYYYMMDD_HHMMSS.vtt
+_TS_RE = re.compile(r"_(\d{8}_\d{6})\.vtt$")
+_SPEAKER_OPEN_RE = re.compile(r'<v [^>]*>')
+_SPEAKER_CLOSE_RE = re.compile(r'</v>')
+
+
+@lru_cache(maxsize=256)
+def _parse_vtt_cached(vtt_path: str, mtime_ns: int) -> Tuple[Tuple[str, str, str], ...]:
+    """Parse a VTT file into (text, start, end) tuples; mtime_ns keys the cache."""
+    segments = []
+    try:
+        for caption in webvtt.read(vtt_path):
+            try:
+                # Clean the text: remove multiple spaces, newlines, and speaker tags
+                text = caption.text
+                # Remove speaker tags if present
+                text = _SPEAKER_OPEN_RE.sub('', text)
+                text = _SPEAKER_CLOSE_RE.sub('', text)
+                # Clean up whitespace
+                text = " ".join(text.split())
+
+                if text.strip():  # Only add non-empty segments
+                    segments.append((text, caption.start, caption.end))
+            except Exception as e:
+                print(f"Warning: Failed to parse caption in {vtt_path}: {str(e)}")
+                continue
+
+        if not segments:
+            raise ValueError(f"No valid segments found in transcript: {vtt_path}")
+
+        return tuple(segments)
+    except Exception as e:
+        raise ValueError(f"Failed to parse VTT file {vtt_path}: {str(e)}")
+
 
 class TranscriptSegment:
+    __slots__ = ("text", "start", "end")
+
     def __init__(self, text: str, start: str, end: str):
         self.text = text
         self.start = start
@@ -23,34 +62,23 @@ class TranscriptProcessor:
         self.transcripts_dir = Path(transcripts_dir)
 
     def parse_vtt(self, vtt_path: str) -> List[TranscriptSegment]:
-        """Parse a VTT file into segments."""
-        segments = []
+        """
+        Parse a VTT file into segments.
+
+        Segment start/end are kept as webvtt's "HH:MM:SS.mmm" strings, which is
+        the form stored in the index and displayed by the retriever. Parsed
+        captions are cached per (path, mtime) so unchanged files are not re-read.
+        """
         try:
-            for caption in webvtt.read(vtt_path):
-                try:
-                    # Clean the text: remove multiple spaces, newlines, and speaker tags
-                    text = caption.text
-                    # Remove speaker tags if present
-                    text = re.sub(r'<v [^>]*>', '', text)
-                    text = re.sub(r'</v>', '', text)
-                    # Clean up whitespace
-                    text = " ".join(text.split())
-                    
-                    if text.strip():  # Only add non-empty segments
-                        segments.append(
-                            TranscriptSegment(text=text, start=caption.start, end=caption.end)
-                        )
-                except Exception as e:
-                    print(f"Warning: Failed to parse caption in {vtt_path}: {str(e)}")
-                    continue
-                    
-            if not segments:
-                raise ValueError(f"No valid segments found in transcript: {vtt_path}")
-                
-            return segments
-        except Exception as e:
+            mtime_ns = os.stat(vtt_path).st_mtime_ns
+        except OSError as e:
             raise ValueError(f"Failed to parse VTT file {vtt_path}: {str(e)}")
 
+        return [
+            TranscriptSegment(text=text, start=start, end=end)
+            for text, start, end in _parse_vtt_cached(str(vtt_path), mtime_ns)
+        ]
+
     def extract_metadata(self, video_path: str, transcript_path: str) -> Dict:
         """Extract metadata from video and transcript files."""
         video_path = Path(video_path)
@@ -61,7 +89,7 @@ class TranscriptProcessor:
 
         # Extract timestamp from transcript filename if it exists
         # Format: filename_YYYYMMDD_HHMMSS.vtt
-        timestamp_match = re.search(r"_(\d{8}_\d{6})\.vtt$", transcript_path.name)
+        timestamp_match = _TS_RE.search(transcript_path.name)
         processed_date = None
         if timestamp_match:
             date_str = timestamp_match.group(1)
@@ -97,33 +125,59 @@ class TranscriptProcessor:
 
         return metadata
 
-    def find_matching_transcript(self, video_filename: str) -> Optional[Path]:
-        """Find the matching transcript file for a video."""
+    def build_transcript_index(self) -> List[Tuple[str, Path]]:
+        """
+        List (lowercased stem, path) for every transcript, in one directory scan.
+
+        Files are not stat-ed here; find_matching_transcript only reads the
+        mtime of the partial-match candidates it has to choose between.
+        """
+        return [
+            (transcript.stem.lower(), transcript)
+            for transcript in self.transcripts_dir.glob("*.vtt")
+        ]
+
+    def find_matching_transcript(
+        self,
+        video_filename: str,
+        transcript_index: Optional[List[Tuple[str, Path]]] = None,
+    ) -> Optional[Path]:
+        """
+        Find the matching transcript file for a video.
+
+        Args:
+            video_filename: Name of the video file
+            transcript_index: Prebuilt build_transcript_index() result, so that
+                matching many videos scans the transcripts directory only once
+        """
         try:
             base_name = Path(video_filename).stem.lower()
+            if transcript_index is None:
+                transcript_index = self.build_transcript_index()
             
             # First try exact match with same name
-            exact_match = self.transcripts_dir / f"{base_name}.vtt"
-            if exact_match.exists():
-                print(f"Found exact transcript match: {exact_match.name}")
-                return exact_match
+            exact_name = f"{base_name}.vtt"
+            for _, transcript in transcript_index:
+                if transcript.name == exact_name:
+                    print(f"Found exact transcript match: {transcript.name}")
+                    return transcript
             
             # Then try case-insensitive match
-            for transcript in self.transcripts_dir.glob("*.vtt"):
-                if transcript.stem.lower() == base_name:
+            for stem, transcript in transcript_index:
+                if stem == base_name:
                     print(f"Found case-insensitive match: {transcript.name}")
                     return transcript
             
             # Try partial match (for timestamped files)
-            matching_transcripts = []
-            for transcript in self.transcripts_dir.glob("*.vtt"):
-                transcript_stem = transcript.stem.lower()
-                if transcript_stem.startswith(base_name) or base_name.startswith(transcript_stem):
-                    matching_transcripts.append(transcript)
+            matching_transcripts = [
+                (transcript.stat().st_mtime, transcript)
+                for stem, transcript in transcript_index
+                if stem.startswith(base_name) or base_name.startswith(stem)
+            ]
             
             if matching_transcripts:
                 # Return the most recent transcript if multiple exist
-                best_match = sorted(matching_transcripts, key=lambda x: x.stat().st_mtime)[-1]
+                best_match = max(matching_transcripts, key=lambda x: x[0])[1]
                 print(f"Found partial match: {best_match.name}")
                 return best_match
             
@@ -138,14 +192,20 @@ class TranscriptProcessor:
             print(f"Warning: Error finding transcript for {video_filename}: {str(e)}")
             return None
 
-    def process_video(self, video_filename: str) -> Optional[Dict]:
+    def process_video(
+        self,
+        video_filename: str,
+        transcript_index: Optional[List[Tuple[str, Path]]] = None,
+    ) -> Optional[Dict]:
         """Process a single video and its transcript."""
         try:
             video_path = self.videos_dir / video_filename
             if not video_path.exists():
                 raise FileNotFoundError(f"Video file not found: {video_filename}")
 
-            transcript_path = self.find_matching_transcript(video_filename)
+            transcript_path = self.find_matching_transcript(
+                video_filename, transcript_index
+            )
             if not transcript_path:
                 raise FileNotFoundError(
                     f"No matching transcript found for video: {video_filename}"
@@ -173,11 +233,49 @@ class TranscriptProcessor:
     def process_all_videos(self) -> List[Dict]:
         """Process all videos in the videos directory."""
         results = []
-        for video_file in self.videos_dir.glob("*.mp4"):
-            try:
-                result = self.process_video(video_file.name)
-                if result:
+        # Scan the transcripts directory once for all videos
+        transcript_index = self.build_transcript_index()
+        video_filenames = [video_file.name for video_file in self.videos_dir.glob("*.mp4")]
+        if not video_filenames:
+            return results
+
+        # VTT parsing is CPU-bound, so spread videos across processes. The
+        # index is sent to each worker once through the initializer, and
+        # videos are handed out in chunks to keep per-task IPC small
+        workers = min(os.cpu_count() or 1, len(video_filenames))
+        chunksize = max(1, len(video_filenames) // (workers * 4))
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(str(self.videos_dir), str(self.transcripts_dir), transcript_index),
+        ) as executor:
+            outcomes = executor.map(_process_video_worker, video_filenames, chunksize=chunksize)
+            for video_filename, result, error in outcomes:
+                if error:
+                    print(f"Error processing {video_filename}: {error}")
+                elif result:
                     results.append(result)
-            except Exception as e:
-                print(f"Error processing {video_file.name}: {str(e)}")
         return results
+
+
+# Per-process state set up by _init_worker
+_worker_processor: Optional[TranscriptProcessor] = None
+_worker_transcript_index: List[Tuple[str, Path]] = []
+
+
+def _init_worker(
+    videos_dir: str, transcripts_dir: str, transcript_index: List[Tuple[str, Path]]
+) -> None:
+    """Build the worker's processor and keep the shared transcript index."""
+    global _worker_processor, _worker_transcript_index
+    _worker_processor = TranscriptProcessor(videos_dir, transcripts_dir)
+    _worker_transcript_index = transcript_index
+
+
+def _process_video_worker(video_filename: str) -> Tuple[str, Optional[Dict], Optional[str]]:
+    """Process one video in a worker process; returns (filename, result, error)."""
+    try:
+        result = _worker_processor.process_video(video_filename, _worker_transcript_index)
+        return video_filename, result, None
+    except Exception as e:
+        return video_filename, None, str(e)
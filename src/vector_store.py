@@ -4,44 +4,98 @@ from langchain_openai import OpenAIEmbeddings
 from dotenv import load_dotenv
 import os
 import time
-from elasticsearch import Elasticsearch
-from typing import List, Dict, Optional
+import hashlib
+from elasticsearch import Elasticsearch, helpers
+from typing import Iterator, List, Dict, Optional, Set
 import json
+import logging
 from datetime import datetime
 from transcript_processor import TranscriptProcessor
+from embedding_cache import CachedEmbeddings
+from semantic_cache import SemanticCache
+from config_utils import config as app_config
 from pathlib import Path
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class VideoTranscriptionStore:
+    # Segments embedded per API request and indexed per bulk request
+    UPSERT_BATCH_SIZE = 500
+    # Segments embedded per API request when upserting all videos together
+    # (the embeddings endpoint accepts up to 2048 inputs)
+    ALL_VIDEOS_EMBED_BATCH_SIZE = 2048
+    # parallel_bulk indexing threads (within the client's connections_per_node)
+    BULK_THREADS = 8
+    # Upper bound on a bulk request body (500 segments of 512-dim vectors
+    # serialize to roughly 5-6 MB)
+    BULK_MAX_CHUNK_BYTES = 50 * 1024 * 1024
+    # Embedding size requested from the model and mapped in the index
+    EMBEDDING_DIMENSIONS = 512
+    # Lower bound on HNSW candidates per shard for kNN searches
+    KNN_MIN_CANDIDATES = 30
+    # Cosine similarity at which a past query's search results are reused
+    SEARCH_CACHE_THRESHOLD = app_config.retrieval.get("search_cache_threshold", 0.86)
+    SEARCH_CACHE_SIZE = app_config.retrieval.get("search_cache_size", 1024)
+
     def __init__(self, videos_dir: str, transcripts_dir: str):
         self.vector_store = self.init_vector_store()
+        # Filenames known to be in the index, loaded on first use
+        self._indexed_videos: Optional[Set[str]] = None
+        # Recent kNN results keyed by query embedding; cleared on writes
+        self.search_cache = SemanticCache(
+            threshold=self.SEARCH_CACHE_THRESHOLD,
+            max_entries=self.SEARCH_CACHE_SIZE,
+        )
+        # Bumped on every write, so caches outside the store (e.g. generated
+        # answers) can tell their entries are stale
+        self.generation = 0
         self.processor = TranscriptProcessor(videos_dir, transcripts_dir)
         self.transcriber = None  # Will be initialized when needed
 
     def init_vector_store(self) -> ElasticsearchStore:
-        # Initialize OpenAI embeddings with smaller dimensions for testing
-        embeddings = OpenAIEmbeddings(
-            model="text-embedding-3-small",  # Use smaller model for testing
-            max_retries=3,
-            request_timeout=30,
+        # Initialize OpenAI embeddings with smaller dimensions for testing,
+        # caching query vectors so repeated questions skip the embedding call
+        # and segment vectors on disk so re-runs skip already embedded text
+        model = "text-embedding-3-small"  # Use smaller model for testing
+        embeddings = CachedEmbeddings(
+            OpenAIEmbeddings(
+                model=model,
+                dimensions=self.EMBEDDING_DIMENSIONS,
+                chunk_size=2048,  # Texts per embeddings API request (API maximum)
+                max_retries=3,
+                request_timeout=30,
+            ),
+            cache_path=app_config.paths.get("embedding_cache"),
+            model_name=f"{model}:{self.EMBEDDING_DIMENSIONS}",
         )
+        # Kept so callers can embed queries themselves (e.g. the semantic cache)
+        self.embeddings = embeddings
 
-        # Wait for Elasticsearch to be ready
+        # One client, shared with the vector store below, so there is a
+        # single connection pool; gzip shrinks the large kNN/bulk payloads
         es_client = Elasticsearch(
             os.getenv("ELASTICSEARCH_URL"),
             basic_auth=(os.getenv("ELASTICSEARCH_USERNAME"),   os.getenv("ELASTICSEARCH_PASSWORD")),
             retry_on_timeout=True,
             max_retries=3,
             request_timeout=30,
+            http_compress=True,
+            connections_per_node=25,  # Enough for the parallel_bulk threads
         )
-
-        # Wait for up to 30 seconds for Elasticsearch to be ready
-        start_time = time.time()
-        while time.time() - start_time < 30:
+        self.es = es_client
+
+        # Wait for up to 30 seconds for Elasticsearch to be ready, probing
+        # with a short timeout and backing off from 50 ms up to 2 s so
+        # start-up is fast when the cluster is already up
+        probe = es_client.options(request_timeout=1, max_retries=0)
+        deadline = time.monotonic() + 30
+        delay = 0.05
+        while time.monotonic() < deadline:
             try:
-                if es_client.ping():
+                if probe.ping():
                     print("Successfully connected to Elasticsearch")
 
                     # Configure index settings if it doesn't exist
@@ -58,9 +112,19 @@ class VideoTranscriptionStore:
                                 "mappings": {
                                     "properties": {
                                         "text": {"type": "text"},
-                                        "embedding": {
+                                        # Field langchain's ElasticsearchStore
+                                        # writes to; int8_hnsw keeps the HNSW
+                                        # graph quantized to one byte per dim
+                                        "vector": {
                                             "type": "dense_vector",
-                                            "dims": 1536,
+                                            "dims": self.EMBEDDING_DIMENSIONS,
+                                            "index": True,
+                                            "similarity": "cosine",
+                                            "index_options": {
+                                                "type": "int8_hnsw",
+                                                "m": 16,
+                                                "ef_construction": 100,
+                                            },
                                         },
                                         "metadata": {"type": "object"},
                                     }
@@ -72,20 +136,39 @@ class VideoTranscriptionStore:
                         )
                     break
             except Exception as e:
-                print(f"Waiting for Elasticsearch to be ready... {str(e)}")
-                time.sleep(2)
+                logger.warning("Waiting for Elasticsearch to be ready... %s", e)
+            time.sleep(delay)
+            delay = min(delay * 1.7, 2.0)
         else:
             raise Exception("Could not connect to Elasticsearch after 30 seconds")
 
+        # An index created before the switch to 512-dim "vector" embeddings
+        # cannot serve kNN queries from this code, so refuse to start on it
+        self._check_vector_mapping(es_client)
+
         # Initialize vector store
         return ElasticsearchStore(
-            es_url="http://localhost:9200",
+            es_connection=es_client,
             index_name="video-transcriptions",
             embedding=embeddings,
-            es_user="elastic",
-            es_password="changeme",
         )
 
+    def _check_vector_mapping(self, es_client: Elasticsearch) -> None:
+        """Raise if the existing index does not map the vector field this store writes."""
+        response = es_client.indices.get_mapping(index="video-transcriptions")
+        mapping = next(iter(response.values()))["mappings"]
+        field = mapping.get("properties", {}).get("vector", {})
+        if (
+            field.get("type") != "dense_vector"
+            or field.get("dims") != self.EMBEDDING_DIMENSIONS
+        ):
+            raise Exception(
+                "Index video-transcriptions does not map 'vector' as a "
+                f"{self.EMBEDDING_DIMENSIONS}-dim dense_vector (found {field or 'no such field'}); "
+                "it was created by an older version. Delete the index and run "
+                "upsert_all_videos to rebuild it."
+            )
+
     # def init_transcriber(self, api_key: str):
     #     """Initialize the video transcriber with API key."""
     #     # from video_transcriber import VideoTranscriber
@@ -95,153 +178,69 @@ class VideoTranscriptionStore:
     def is_video_upserted(self, video_filename: str) -> bool:
         """Check if a video is already upserted in the vector store."""
         try:
-            # Use a direct Elasticsearch query to check for any documents with this video filename
-            es_client = self.vector_store.client
-
-            # First check if index exists
-            if not es_client.indices.exists(index="video-transcriptions"):
-                return False
-
-            response = es_client.search(
-                index="video-transcriptions",  # Use the hardcoded index name
-                body={
-                    "query": {
-                        "term": {"metadata.video_filename.keyword": video_filename}
-                    },
-                    "size": 1,
-                },
-            )
-
-            return response["hits"]["total"]["value"] > 0
+            # Indexed filenames are fetched once with a terms aggregation and
+            # kept up to date by upsert/delete, so each check is a set lookup
+            if self._indexed_videos is None:
+                self._indexed_videos = self._loaded_videos()
+            return video_filename in self._indexed_videos
         except Exception as e:
-            print(f"Error checking video status: {str(e)}")
+            logger.exception("Error checking video status for %s", video_filename)
             # If check fails, assume not upserted to be safe
             return False
 
-    def upsert_video(self, video_filename: str) -> None:
+    def _loaded_videos(self) -> Set[str]:
+        """Return the filenames of all videos with segments in the vector store."""
+        es_client = self.es
+        if not es_client.indices.exists(index="video-transcriptions"):
+            return set()
+
+        # A single terms aggregation instead of one query per video
+        response = es_client.search(
+            index="video-transcriptions",
+            body={
+                "size": 0,
+                "aggs": {
+                    "videos": {
+                        "terms": {
+                            "field": "metadata.video_filename.keyword",
+                            "size": 65536,  # Default search.max_buckets
+                        }
+                    }
+                },
+            },
+        )
+        return {
+            bucket["key"]
+            for bucket in response["aggregations"]["videos"]["buckets"]
+        }
+
+    def upsert_video(self, video_filename: str, check_existing: bool = True) -> None:
         """
         Process and upsert a single video's transcription.
 
         Args:
             video_filename: Name of the video file
+            check_existing: Skip the video if it is already in the vector store
+                (callers that already know it is not can pass False)
         """
         try:
-            # Check if video exists
-            video_path = Path(self.processor.videos_dir) / video_filename
-            if not video_path.exists():
-                raise FileNotFoundError(f"Video file {video_filename} not found.")
-
             # Check if video is already upserted
-            if self.is_video_upserted(video_filename):
+            if check_existing and self.is_video_upserted(video_filename):
                 print(
                     f"Video {video_filename} is already in the vector store. Skipping."
                 )
                 return
 
-            # Try to find existing transcript
-            transcript_path = self.processor.find_matching_transcript(video_filename)
-            if not transcript_path:
-                raise FileNotFoundError(
-                    f"No transcript found for {video_filename} and no transcriber configured."
-                )
-
-            # Process the video and its transcript
-            print(f"Processing {video_filename}...")
-            result = self.processor.process_video(video_filename)
-            if not result or not result.get("segments"):
-                raise ValueError(f"No valid segments found in video: {video_filename}")
-
-            # Track unique segments to prevent duplicates
-            seen_segments = set()
-            documents = []
+            documents = self._build_documents(video_filename)
             failed_segments = []
-
-            # Pre-process all segments first
-            for segment in result["segments"]:
-                try:
-                    # Clean and validate the text
-                    text = segment["text"].strip()
-                    if not text or len(text) < 3:  # Skip very short segments
-                        continue
-
-                    # Create a unique key for this segment
-                    segment_key = (
-                        text,
-                        segment["start_time"],
-                        segment["end_time"],
-                    )
-
-                    # Skip if we've seen this segment before
-                    if segment_key in seen_segments:
-                        continue
-
-                    seen_segments.add(segment_key)
-
-                    # Create a Document object with the segment text and metadata
-                    metadata = result["metadata"].copy()
-                    metadata.update(
-                        {
-                            "start_time": segment["start_time"],
-                            "end_time": segment["end_time"],
-                            "video_filename": video_filename,
-                            "segment_index": len(documents),
-                            "segment_id": f"{video_filename}_{len(documents)}",
-                        }
-                    )
-
-                    doc = Document(page_content=text, metadata=metadata)
-                    documents.append(doc)
-                except Exception as e:
-                    print(f"Warning: Failed to process segment: {str(e)}")
-                    failed_segments.append((segment, str(e)))
-
-            if not documents:
-                raise ValueError(
-                    f"No valid segments to index in video: {video_filename}"
-                )
-
-            print(f"Found {len(documents)} valid segments in {video_filename}")
-
-            # Add documents to the vector store in smaller batches
-            batch_size = 5  # Even smaller batch size for testing
-            successful_segments = 0
-
-            for i in range(0, len(documents), batch_size):
-                batch = documents[i : i + batch_size]
-                try:
-                    # Try to add the batch
-                    print(
-                        f"Attempting to index batch {i//batch_size + 1}/{(len(documents)-1)//batch_size + 1}..."
-                    )
-                    import uuid
-                    uuids = [str(uuid.uuid4()) for _ in range(len(batch))]
-                    self.vector_store.add_documents(batch, uuids)
-                    successful_segments += len(batch)
-                    print(
-                        f"Successfully indexed batch {i//batch_size + 1}/{(len(documents)-1)//batch_size + 1} for {video_filename}"
-                    )
-                except Exception as batch_error:
-                    print(f"Batch {i//batch_size + 1} failed: {str(batch_error)}")
-                    print("Trying individual documents...")
-
-                    # If batch fails, try each document individually
-                    for doc in batch:
-                        try:
-                            self.vector_store.add_documents([doc])
-                            successful_segments += 1
-                            print(
-                                f"Successfully indexed individual segment: {doc.page_content[:50]}..."
-                            )
-                        except Exception as doc_error:
-                            error_msg = str(doc_error)
-                            print(f"Failed to index segment: {error_msg}")
-                            failed_segments.append((doc.page_content, error_msg))
-
-                # Small delay between batches
-                time.sleep(1)
+            successful_segments = self._index_documents(
+                documents, failed_segments, self.UPSERT_BATCH_SIZE, video_filename
+            )
 
             # Report results
             if successful_segments > 0:
+                if self._indexed_videos is not None:
+                    self._indexed_videos.add(video_filename)
                 print(
                     f"Successfully indexed {successful_segments}/{len(documents)} segments from {video_filename}"
                 )
@@ -253,16 +252,225 @@ class VideoTranscriptionStore:
                         f"All {failed_count} segments failed to index in {video_filename}. First error: {failed_segments[0][1]}"
                     )
                 else:
-                    print(
-                        f"Warning: {failed_count} segment(s) failed to index in {video_filename}"
+                    logger.warning(
+                        "%d segment(s) failed to index in %s", failed_count, video_filename
                     )
-                    print("First few errors:")
-                    for content, error in failed_segments[:3]:
-                        print(f"- {content[:50]}...: {error}")
+                    for segment_id, error in failed_segments[:3]:
+                        logger.warning("- %s: %s", segment_id, error)
 
         except Exception as e:
             raise Exception(f"Error processing video {video_filename}: {str(e)}")
 
+    def _build_documents(
+        self,
+        video_filename: str,
+        entry: Optional[os.DirEntry] = None,
+        transcript_index: Optional[List] = None,
+    ) -> List[Document]:
+        """
+        Turn a video's transcript into deduplicated segment documents.
+
+        Each document's id is the deterministic Elasticsearch _id of its
+        segment. Malformed segments are logged and skipped like empty ones.
+
+        Args:
+            video_filename: Name of the video file
+            entry: Directory entry the video was listed from; when given the
+                file is known to exist and is not stat-ed again
+            transcript_index: Prebuilt TranscriptProcessor transcript index,
+                shared across videos to avoid rescanning the directory
+
+        Returns:
+            The documents to index
+        """
+        # Check if video exists
+        if entry is None:
+            video_path = Path(self.processor.videos_dir) / video_filename
+            if not video_path.exists():
+                raise FileNotFoundError(f"Video file {video_filename} not found.")
+
+        # Scan the transcripts directory once for both the lookup below and
+        # process_video, unless the caller already did for a whole batch
+        if transcript_index is None:
+            transcript_index = self.processor.build_transcript_index()
+
+        # Try to find existing transcript
+        transcript_path = self.processor.find_matching_transcript(
+            video_filename, transcript_index
+        )
+        if not transcript_path:
+            raise FileNotFoundError(
+                f"No transcript found for {video_filename} and no transcriber configured."
+            )
+
+        # Process the video and its transcript
+        print(f"Processing {video_filename}...")
+        result = self.processor.process_video(video_filename, transcript_index)
+        if not result or not result.get("segments"):
+            raise ValueError(f"No valid segments found in video: {video_filename}")
+
+        # Track unique segments to prevent duplicates
+        seen_segments = set()
+        documents = []
+
+        base_metadata = result["metadata"]
+
+        # Pre-process all segments first
+        for segment in result["segments"]:
+            try:
+                # Clean and validate the text
+                text = segment["text"].strip()
+                if not text or len(text) < 3:  # Skip very short segments
+                    continue
+
+                # Create a unique key for this segment
+                segment_key = (
+                    text,
+                    segment["start_time"],
+                    segment["end_time"],
+                )
+
+                # Skip if we've seen this segment before
+                if segment_key in seen_segments:
+                    continue
+
+                seen_segments.add(segment_key)
+
+                # Create a Document object with the segment text and metadata,
+                # built in one step on top of the shared video metadata
+                segment_index = len(documents)
+                metadata = {
+                    **base_metadata,
+                    "start_time": segment["start_time"],
+                    "end_time": segment["end_time"],
+                    "video_filename": video_filename,
+                    "segment_index": segment_index,
+                    "segment_id": f"{video_filename}_{segment_index}",
+                }
+
+                doc = Document(
+                    id=self._segment_doc_id(metadata, text),
+                    page_content=text,
+                    metadata=metadata,
+                )
+                documents.append(doc)
+            except Exception as e:
+                logger.warning("Skipping malformed segment in %s: %s", video_filename, e)
+
+        if not documents:
+            raise ValueError(
+                f"No valid segments to index in video: {video_filename}"
+            )
+
+        print(f"Found {len(documents)} valid segments in {video_filename}")
+        return documents
+
+    @staticmethod
+    def _segment_doc_id(metadata: Dict, text: str) -> str:
+        """Return the deterministic _id of a segment."""
+        # Deterministic ids make re-indexing a video overwrite its
+        # segments instead of duplicating them
+        segment_key = "\x1f".join(
+            (
+                metadata["video_filename"],
+                str(metadata["start_time"]),
+                str(metadata["end_time"]),
+                text,
+            )
+        )
+        return hashlib.sha1(segment_key.encode("utf-8")).hexdigest()
+
+    def _index_documents(
+        self,
+        documents: List[Document],
+        failed_segments: List,
+        embed_batch_size: int,
+        label: str,
+        refresh: bool = True,
+    ) -> int:
+        """
+        Embed and bulk index documents, returning how many were indexed.
+
+        Failures are appended to failed_segments as (segment _id, error)
+        pairs, at most one per document. With refresh=False the caller is
+        responsible for refreshing the index and invalidating caches, as
+        _end_bulk does once per bulk load.
+        """
+        # Embed in large batches (one API request each) and stream the
+        # resulting actions through parallel_bulk, so the next batch is
+        # embedded while earlier chunks are being indexed
+        successful_segments = 0
+        for ok, info in helpers.parallel_bulk(
+            self.es,
+            self._index_actions(documents, failed_segments, embed_batch_size, label),
+            thread_count=self.BULK_THREADS,
+            chunk_size=self.UPSERT_BATCH_SIZE,
+            max_chunk_bytes=self.BULK_MAX_CHUNK_BYTES,
+            queue_size=4,
+            raise_on_error=False,
+            raise_on_exception=False,
+        ):
+            if ok:
+                successful_segments += 1
+            else:
+                item = info.get("index", {})
+                error_msg = str(item.get("error", info))
+                logger.warning("Failed to index segment %s: %s", item.get("_id"), error_msg)
+                failed_segments.append((item.get("_id", ""), error_msg))
+
+        if refresh:
+            # Make the new segments searchable now rather than at the next
+            # scheduled refresh
+            self.es.indices.refresh(index="video-transcriptions")
+            self._invalidate_caches()
+        return successful_segments
+
+    def _index_actions(
+        self,
+        documents: List[Document],
+        failed_segments: List,
+        batch_size: int,
+        label: str,
+    ) -> Iterator[Dict]:
+        """Yield bulk index actions for documents, embedding them batch by batch."""
+        total_batches = (len(documents) - 1) // batch_size + 1
+
+        for i in range(0, len(documents), batch_size):
+            batch = documents[i : i + batch_size]
+            texts = [doc.page_content for doc in batch]
+            try:
+                print(f"Embedding batch {i//batch_size + 1}/{total_batches} for {label}...")
+                vectors = self.embeddings.embed_documents(texts)
+            except Exception as batch_error:
+                logger.warning(
+                    "Batch %d failed for %s, trying individual documents: %s",
+                    i // batch_size + 1, label, batch_error,
+                )
+                # If the batch fails, embed each document individually
+                vectors = []
+                for doc in batch:
+                    try:
+                        vectors.append(self.embeddings.embed_documents([doc.page_content])[0])
+                    except Exception as doc_error:
+                        error_msg = str(doc_error)
+                        logger.warning("Failed to embed segment %s: %s", doc.id, error_msg)
+                        failed_segments.append((doc.id, error_msg))
+                        vectors.append(None)
+
+            for doc, vector in zip(batch, vectors):
+                if vector is None:
+                    continue
+                yield {
+                    "_op_type": "index",
+                    "_index": "video-transcriptions",
+                    "_id": doc.id,
+                    "_source": {
+                        "text": doc.page_content,
+                        "vector": vector,
+                        "metadata": doc.metadata,
+                    },
+                }
+
     def update_video_metadata(self, video_filename: str) -> None:
         """Update metadata for all segments of a video in the vector store."""
         try:
@@ -275,7 +483,7 @@ class VideoTranscriptionStore:
             base_metadata = result["metadata"]
 
             # Update all segments for this video
-            es_client = self.vector_store.client
+            es_client = self.es
             es_client.update_by_query(
                 index="video-transcriptions",
                 body={
@@ -305,15 +513,16 @@ class VideoTranscriptionStore:
                 },
                 refresh=True
             )
+            self._invalidate_caches()
             print(f"✓ Updated metadata for all segments of {video_filename}")
         except Exception as e:
-            print(f"Error updating metadata for {video_filename}: {str(e)}")
+            logger.exception("Error updating metadata for %s", video_filename)
             raise
 
     def delete_video(self, video_filename: str) -> None:
         """Delete all segments for a video from the vector store."""
         try:
-            es_client = self.vector_store.client
+            es_client = self.es
             es_client.delete_by_query(
                 index="video-transcriptions",
                 body={
@@ -322,84 +531,343 @@ class VideoTranscriptionStore:
                     }
                 }
             )
+            if self._indexed_videos is not None:
+                self._indexed_videos.discard(video_filename)
+            self._invalidate_caches()
             print(f"Deleted all segments for {video_filename}")
         except Exception as e:
-            print(f"Error deleting video {video_filename}: {str(e)}")
+            logger.exception("Error deleting video %s", video_filename)
             raise
 
+    def _invalidate_caches(self) -> None:
+        """Drop cached search results after the index changed."""
+        self.generation += 1
+        self.search_cache.clear()
+
+    def _begin_bulk(self) -> Dict:
+        """
+        Pause refreshes and replication on the index for a bulk load.
+
+        Returns:
+            The previous settings, to hand back to _end_bulk (empty if the
+            index does not exist yet)
+        """
+        es_client = self.es
+        if not es_client.indices.exists(index="video-transcriptions"):
+            return {}
+
+        response = es_client.indices.get_settings(index="video-transcriptions")
+        current = next(iter(response.values()))["settings"]["index"]
+        # None resets a setting that was never set explicitly to its default
+        previous = {
+            "refresh_interval": current.get("refresh_interval"),
+            "number_of_replicas": current.get("number_of_replicas"),
+        }
+        es_client.indices.put_settings(
+            index="video-transcriptions",
+            settings={"index": {"refresh_interval": "-1", "number_of_replicas": 0}},
+        )
+        return previous
+
+    def _end_bulk(self, previous: Dict) -> None:
+        """
+        Restore the settings saved by _begin_bulk, then refresh once so the
+        segments indexed during the bulk load become searchable.
+        """
+        es_client = self.es
+        if previous:
+            es_client.indices.put_settings(
+                index="video-transcriptions", settings={"index": previous}
+            )
+        es_client.indices.refresh(
+            index="video-transcriptions", ignore_unavailable=True
+        )
+        self._invalidate_caches()
+
     def upsert_all_videos(self) -> None:
         """Process and upsert all videos in the videos directory."""
-        videos_dir = Path(self.processor.videos_dir)
-        for video_file in videos_dir.glob("*.mp4"):
-            print(f"\nProcessing {video_file.name}...")
-            self.upsert_video(video_file.name)
+        # scandir entries carry their file type, so listing needs no extra
+        # stat calls and each entry is passed on instead of re-checked
+        with os.scandir(self.processor.videos_dir) as it:
+            entries = {
+                entry.name: entry
+                for entry in it
+                if entry.name.endswith(".mp4") and entry.is_file()
+            }
+        video_files = set(entries)
+
+        # Skip already-indexed videos using one aggregation over the index
+        loaded = self._loaded_videos()
+        self._indexed_videos = set(loaded)
+        for video_filename in sorted(video_files & loaded):
+            print(
+                f"Video {video_filename} is already in the vector store. Skipping."
+            )
+        video_files = sorted(video_files - loaded)
+
+        if not video_files:
+            return
+
+        # Pause refreshes and replication while bulk loading; the index is
+        # refreshed once in _end_bulk rather than after each batch
+        previous_settings = self._begin_bulk()
+        try:
+            # Phase 1: collect segment documents from every pending video
+            documents = []
+            failed_segments = []
+            failed_videos = {}
+            transcript_index = self.processor.build_transcript_index()
+            for video_filename in video_files:
+                try:
+                    video_documents = self._build_documents(
+                        video_filename, entries[video_filename], transcript_index
+                    )
+                except Exception as e:
+                    logger.warning("Skipping %s: %s", video_filename, e)
+                    failed_videos[video_filename] = str(e)
+                    continue
+                documents.extend(video_documents)
+
+            # Phase 2: embed across videos in ALL_VIDEOS_EMBED_BATCH_SIZE requests
+            # and bulk index, instead of many small per-video batches
+            if documents:
+                successful_segments = self._index_documents(
+                    documents,
+                    failed_segments,
+                    self.ALL_VIDEOS_EMBED_BATCH_SIZE,
+                    f"{len(video_files) - len(failed_videos)} videos",
+                    refresh=False,
+                )
+                if successful_segments > 0:
+                    self._indexed_videos.update(
+                        doc.metadata["video_filename"] for doc in documents
+                    )
+                print(
+                    f"Successfully indexed {successful_segments}/{len(documents)} segments from {len(video_files) - len(failed_videos)} videos"
+                )
+                if failed_segments:
+                    logger.warning("%d segment(s) failed to index", len(failed_segments))
+                    for segment_id, error in failed_segments[:3]:
+                        logger.warning("- %s: %s", segment_id, error)
+        finally:
+            self._end_bulk(previous_settings)
+
+        if failed_videos:
+            raise Exception(
+                f"Failed to process {len(failed_videos)} video(s): "
+                + "; ".join(f"{name}: {error}" for name, error in failed_videos.items())
+            )
 
     def search_transcriptions(
-        self, query: str, k: int = 5, score_threshold: float = 0.90
-    ) -> List[Dict]:
+        self,
+        query: str,
+        k: int = 5,
+        score_threshold: float = 0.90,
+        filter: Optional[List[Dict]] = None,
+    ) -> Iterator[Dict]:
         """
         Search transcriptions using a natural language query.
 
+        The query is embedded once and sent as a direct kNN search; hits are
+        formatted straight from _source without langchain Document objects.
+
         Args:
             query: Search query
             k: Number of results to return
             score_threshold: Minimum similarity score threshold (default: 0.90)
+            filter: Optional Elasticsearch filter clauses, e.g.
+                [{"term": {"metadata.video_filename.keyword": "intro.mp4"}}]
 
         Returns:
-            List of relevant transcription segments with metadata
+            Iterator over relevant transcription segments with metadata, in
+            descending score order; segments are formatted as they are consumed
+        """
+        try:
+            query_vector = self.embeddings.embed_query(query)
+        except Exception:
+            logger.exception("Error embedding query for vector store search")
+            return
+
+        yield from self.search_by_vector(query_vector, k, score_threshold, filter)
+
+    def search_by_vector(
+        self,
+        query_vector: List[float],
+        k: int = 5,
+        score_threshold: float = 0.90,
+        filter: Optional[List[Dict]] = None,
+    ) -> Iterator[Dict]:
+        """
+        Search transcriptions with an already computed query embedding.
+
+        Args:
+            query_vector: Query embedding from self.embeddings
+            k: Number of results to return
+            score_threshold: Minimum similarity score threshold (default: 0.90)
+            filter: Optional Elasticsearch filter clauses for the kNN search
+
+        Returns:
+            Iterator over relevant transcription segments with metadata, in
+            descending score order; segments are formatted as they are consumed
         """
+        # Near-duplicate queries with the same parameters reuse earlier results
+        params = (k, score_threshold, repr(filter))
+        cached = self.search_cache.get(query_vector, params)
+        if cached is not None:
+            yield from cached
+            return
+
         try:
-            # Get more results initially for better coverage
-            results = self.vector_store.similarity_search_with_score(
-                query, k=k * 4  # Get even more results to account for filtering,
-                # filter=[{"term": metadata}]
+            response = self.es.search(
+                index="video-transcriptions",
+                knn=self._knn_clause(query_vector, k, filter),
+                size=k * 4,
+                source=["text", "metadata"],
             )
+        except Exception:
+            logger.exception("Search error in vector store")
+            return
+
+        collected = []
+        for result in self._format_hits(response["hits"]["hits"], score_threshold):
+            collected.append(result)
+            yield result
+
+        # Only fully consumed searches are cached
+        self.search_cache.put(query_vector, collected, params)
+
+    def search_transcriptions_batch(
+        self,
+        queries: List[str],
+        k: int = 5,
+        score_threshold: float = 0.90,
+        filter: Optional[List[Dict]] = None,
+    ) -> List[List[Dict]]:
+        """
+        Search transcriptions for several queries in one round trip.
 
-            # Format and deduplicate the results
-            seen_segments = set()  # Track unique segments
-            formatted_results = []
-
-            for doc, score in results:
-                # Score from Elasticsearch is already a similarity score (not distance)
-                if score >= score_threshold:
-                    # Create a unique key using content and timing
-                    text = doc.page_content.strip()
-                    video_filename = doc.metadata.get("video_filename", "")
-
-                    # Create segment key with video filename to allow similar segments from different videos
-                    segment_key = (
-                        text,
-                        video_filename,
-                        doc.metadata.get("start_time"),
-                        doc.metadata.get("end_time"),
-                    )
+        Queries go through the same query embedding cache as
+        search_transcriptions, with the uncached ones embedded in one request,
+        and are searched with a single _msearch; cached results are reused and
+        not searched again.
 
-                    # Skip if we've seen this exact segment
-                    if segment_key in seen_segments:
-                        continue
+        Args:
+            queries: Search queries
+            k: Number of results to return per query
+            score_threshold: Minimum similarity score threshold (default: 0.90)
+            filter: Optional Elasticsearch filter clauses, applied to every query
+                as in search_transcriptions
 
-                    seen_segments.add(segment_key)
+        Returns:
+            One result list per query, in the same order, as search_transcriptions
+            would return them (an empty list for a query whose search failed)
+        """
+        if not queries:
+            return []
 
-                    # Format the result
-                    result = {
-                        "text": text,
-                        "video_filename": video_filename,
-                        "start_time": doc.metadata.get("start_time", 0),
-                        "end_time": doc.metadata.get("end_time", 0),
-                        "score": float(score),
-                        "metadata": doc.metadata,
-                    }
-                    formatted_results.append(result)
+        try:
+            query_vectors = self.embeddings.embed_queries(queries)
+        except Exception:
+            logger.exception("Error embedding queries for vector store search")
+            return [[] for _ in queries]
+
+        params = (k, score_threshold, repr(filter))
+        results: List[Optional[List[Dict]]] = [None] * len(queries)
+        searches = []
+        pending = []  # Indexes of queries sent in the msearch
+        for i, query_vector in enumerate(query_vectors):
+            cached = self.search_cache.get(query_vector, params)
+            if cached is not None:
+                results[i] = cached
+                continue
+            pending.append(i)
+            searches.append({"index": "video-transcriptions"})
+            searches.append(
+                {
+                    "knn": self._knn_clause(query_vector, k, filter),
+                    "size": k * 4,
+                    "_source": ["text", "metadata"],
+                }
+            )
 
-            # Sort by score in descending order
-            formatted_results.sort(key=lambda x: x["score"], reverse=True)
+        if pending:
+            try:
+                responses = self.es.msearch(searches=searches)["responses"]
+            except Exception:
+                logger.exception("Batch search error in vector store")
+                responses = [{"error": "msearch failed"}] * len(pending)
+
+            for i, response in zip(pending, responses):
+                if "error" in response:
+                    logger.warning("Search error for query %r: %s", queries[i], response["error"])
+                    results[i] = []
+                    continue
+                results[i] = list(
+                    self._format_hits(response["hits"]["hits"], score_threshold)
+                )
+                self.search_cache.put(query_vectors[i], results[i], params)
+
+        return results
+
+    def _knn_clause(
+        self, query_vector: List[float], k: int, filter: Optional[List[Dict]] = None
+    ) -> Dict:
+        """Build the kNN clause for a search returning k results."""
+        # Get more results initially for better coverage
+        fetch_k = k * 4
+        knn = {
+            "field": "vector",
+            "query_vector": query_vector,
+            "k": fetch_k,
+            # HNSW search cost grows with num_candidates; the client default
+            # of 50 is more than small k needs
+            "num_candidates": max(self.KNN_MIN_CANDIDATES, k * 10, fetch_k),
+        }
+        if filter:
+            knn["filter"] = filter
+        return knn
+
+    @staticmethod
+    def _format_hits(hits: List[Dict], score_threshold: float) -> Iterator[Dict]:
+        """Filter, deduplicate and format raw kNN hits."""
+        # Format and deduplicate the results
+        seen_segments = set()  # Track unique segments
 
-            # Return top k results
-            return formatted_results
+        # Elasticsearch returns hits by descending score, so results can be
+        # yielded as they are formatted without sorting a full list first
+        for hit in hits:
+            score = hit["_score"]
+            # Score from Elasticsearch is already a similarity score (not distance)
+            if score >= score_threshold:
+                source = hit["_source"]
+                metadata = source.get("metadata", {})
+                # Create a unique key using content and timing
+                text = source.get("text", "").strip()
+                video_filename = metadata.get("video_filename", "")
+
+                # Create segment key with video filename to allow similar segments from different videos
+                segment_key = (
+                    text,
+                    video_filename,
+                    metadata.get("start_time"),
+                    metadata.get("end_time"),
+                )
 
-        except Exception as e:
-            print(f"Search error in vector store: {e}")
-            return []
+                # Skip if we've seen this exact segment
+                if segment_key in seen_segments:
+                    continue
+
+                seen_segments.add(segment_key)
+
+                # Format the result
+                yield {
+                    "text": text,
+                    "video_filename": video_filename,
+                    "start_time": metadata.get("start_time", 0),
+                    "end_time": metadata.get("end_time", 0),
+                    "score": float(score),
+                    "metadata": metadata,
+                }
 
     def search_transcriptions_old(
         self, query: str, k: int = 5, score_threshold: float = 0.90
@@ -0,0 +1,44 @@
+import json
+
+from config import Config
+
+
+def _config_for(metadata_file):
+    """Build a Config that reads metadata from metadata_file."""
+    cfg = Config.__new__(Config)
+    cfg.metadata_file = metadata_file
+    cfg.metadata = cfg.load_metadata()
+    cfg._build_metadata_index()
+    return cfg
+
+
+def test_mixed_metadata_file(tmp_path):
+    metadata_file = tmp_path / "index_metadata.json"
+    metadata_file.write_text(json.dumps({
+        "transcript_metadata": [
+            {"video_path": "a.mp4", "title": "A"},
+            # Entry written by extractor.genai_extractor.update_metadata
+            {"metadata": {"file_path": "b.mp4", "vtt_file": "b.vtt"}},
+            {"video_path": "a.mp4", "title": "duplicate"},
+            {"video_path": "c.mp4", "title": "C"},
+        ]
+    }))
+
+    cfg = _config_for(metadata_file)
+
+    assert cfg.get_video_metadata("a.mp4")["title"] == "A"
+    assert cfg.get_video_metadata("c.mp4")["title"] == "C"
+    assert cfg.get_video_metadata("b.mp4") is None
+
+    cfg.update_video_metadata("c.mp4", {"title": "C2"})
+    cfg.update_video_metadata("d.mp4", {"video_path": "d.mp4", "title": "D"})
+    cfg.update_video_metadata("e.mp4", {"metadata": {"file_path": "e.mp4"}})
+
+    assert cfg.get_video_metadata("c.mp4")["title"] == "C2"
+    assert cfg.get_video_metadata("d.mp4")["title"] == "D"
+    assert cfg.get_video_metadata("e.mp4") is None
+
+    # The saved file reloads cleanly
+    reloaded = _config_for(metadata_file)
+    assert reloaded.get_video_metadata("d.mp4")["title"] == "D"
+    assert len(reloaded.metadata["transcript_metadata"]) == 6
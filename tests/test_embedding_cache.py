@@ -0,0 +1,88 @@
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+from embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    """Fake model that records every text it is asked to embed."""
+
+    def __init__(self):
+        self.calls: List[str] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls.extend(texts)
+        return [[float(len(text)), float(sum(map(ord, text)) % 997)] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def _cached(tmp_path):
+    inner = CountingEmbeddings()
+    cache = CachedEmbeddings(
+        inner, cache_path=str(tmp_path / "cache.sqlite"), model_name="test:2"
+    )
+    return inner, cache
+
+
+def test_punctuation_differences_do_not_share_entries(tmp_path):
+    inner, cache = _cached(tmp_path)
+
+    for first, second in [
+        ("We use C++ here", "We use C here"),
+        ("Version 3.5 is out", "Version 35 is out"),
+    ]:
+        cache.embed_documents([first])
+        cache.embed_documents([second])
+        assert inner.calls[-2:] == [first, second]
+
+    assert cache.cache_stats() == {"hits": 0, "misses": 4}
+
+
+def test_spacing_shares_entries_but_case_does_not(tmp_path):
+    inner, cache = _cached(tmp_path)
+
+    vector = cache.embed_documents(["Hello  world"])[0]
+    assert cache.embed_documents(["Hello world", " Hello\tworld "]) == [vector, vector]
+    cache.embed_documents(["US ships", "us ships"])
+    assert inner.calls == ["Hello  world", "US ships", "us ships"]
+    assert cache.cache_stats() == {"hits": 2, "misses": 3}
+
+
+class FractionalEmbeddings(Embeddings):
+    """Fake model returning values that float16 cannot represent exactly."""
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [[0.1234567, -0.7654321] for _ in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def test_miss_and_hit_return_the_same_vector(tmp_path):
+    cache = CachedEmbeddings(
+        FractionalEmbeddings(), cache_path=str(tmp_path / "cache.sqlite"), model_name="test:2"
+    )
+
+    miss = cache.embed_documents(["Hello world"])[0]
+    hit = cache.embed_documents(["Hello world"])[0]
+
+    assert miss == hit
+    assert cache.cache_stats() == {"hits": 1, "misses": 1}
+
+
+def test_batch_queries_share_the_query_cache_only(tmp_path):
+    inner, cache = _cached(tmp_path)
+
+    single = cache.embed_query("What is C++?")
+    batch = cache.embed_queries(["What is C++?", "What is Python?", "What is Python?"])
+
+    # Cached query reused, duplicate missing query embedded once
+    assert inner.calls == ["What is C++?", "What is Python?"]
+    assert batch[0] == single
+    assert batch[1] == batch[2]
+    assert cache.embed_query("What is Python?") == batch[1]
+    # Queries never reach the document cache
+    assert cache._load_vectors([cache._document_key("What is Python?")]) == {}
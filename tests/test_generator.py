@@ -0,0 +1,64 @@
+from types import SimpleNamespace
+
+from generator import VideoResponseGenerator
+from semantic_cache import SemanticCache
+
+SEGMENT = {
+    "text": "Hello there",
+    "video": "talk.mp4",
+    "timestamp": {"start": "00:00", "end": "00:02"},
+    "score": 0.95,
+}
+
+
+class FakeRetriever:
+    def __init__(self):
+        self.index_generation = 0
+        self.searches = 0
+
+    def embed_query(self, query):
+        return [1.0, 0.0]
+
+    def search(self, query, query_vector=None):
+        self.searches += 1
+        return [SEGMENT]
+
+
+class FakeCompletions:
+    def create(self, **params):
+        message = SimpleNamespace(content="An answer")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _generator():
+    generator = VideoResponseGenerator.__new__(VideoResponseGenerator)
+    generator.retriever = FakeRetriever()
+    generator.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+    generator.semantic_cache = SemanticCache(threshold=0.99, max_entries=8)
+    generator._cache_generation = 0
+    return generator
+
+
+def test_cached_answers_are_dropped_after_an_index_write():
+    generator = _generator()
+
+    generator.generate_response("What is said?")
+    generator.generate_response("What is said?")
+    assert generator.retriever.searches == 1
+
+    # A store write (upsert, metadata update, delete) bumps the generation
+    generator.retriever.index_generation += 1
+    response = generator.generate_response("What is said?")
+
+    assert generator.retriever.searches == 2
+    assert response.sources[0].video == "talk.mp4"
+
+
+def test_answer_generated_across_an_index_write_is_not_cached():
+    generator = _generator()
+    cached, query_vector, generation = generator._lookup_cache("What is said?")
+
+    generator.retriever.index_generation += 1
+    generator._cache_answer("What is said?", query_vector, generation, "An answer", [SEGMENT])
+
+    assert len(generator.semantic_cache) == 0
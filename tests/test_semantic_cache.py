@@ -0,0 +1,33 @@
+from semantic_cache import SemanticCache
+
+
+def test_same_vector_is_cached_separately_per_key():
+    cache = SemanticCache(threshold=0.9, max_entries=8)
+    cache.put([1.0, 0.0], "k=5", key=(5,))
+    cache.put([1.0, 0.0], "k=10", key=(10,))
+
+    assert cache.get([1.0, 0.0], (5,)) == "k=5"
+    assert cache.get([1.0, 0.0], (10,)) == "k=10"
+    assert cache.get([1.0, 0.0], (20,)) is None
+    assert cache.get([1.0, 0.0]) is None
+
+
+def test_best_match_is_chosen_among_equal_keys():
+    cache = SemanticCache(threshold=0.9, max_entries=8)
+    cache.put([1.0, 0.0], "other key", key="b")
+    cache.put([0.95, 0.05], "close", key="a")
+
+    # The exact match under key "b" must not hide the close one under "a"
+    assert cache.get([1.0, 0.0], "a") == "close"
+
+
+def test_eviction_drops_keys_of_evicted_entries():
+    cache = SemanticCache(threshold=0.9, max_entries=2)
+    cache.put([1.0, 0.0], "first", key="a")
+    cache.put([0.0, 1.0], "second", key="b")
+    cache.put([0.0, 1.0], "third", key="c")
+
+    assert cache.get([1.0, 0.0], "a") is None
+    assert cache.get([0.0, 1.0], "b") == "second"
+    assert cache.get([0.0, 1.0], "c") == "third"
+    assert len(cache) == 2
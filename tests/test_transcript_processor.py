@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from transcript_processor import TranscriptProcessor
+
+VTT = """WEBVTT
+
+00:00:00.000 --> 00:00:02.000
+Hello there
+"""
+
+
+@pytest.fixture
+def processor(tmp_path):
+    videos_dir = tmp_path / "videos"
+    transcripts_dir = tmp_path / "transcripts"
+    videos_dir.mkdir()
+    transcripts_dir.mkdir()
+    (videos_dir / "talk.mp4").write_bytes(b"")
+    for name, mtime in [
+        ("talk_20240101_000000.vtt", 1_000_000),
+        ("talk_20240202_000000.vtt", 2_000_000),
+        ("other.vtt", 3_000_000),
+    ]:
+        path = transcripts_dir / name
+        path.write_text(VTT)
+        os.utime(path, (mtime, mtime))
+    return TranscriptProcessor(str(videos_dir), str(transcripts_dir))
+
+
+def test_partial_match_picks_most_recent(processor):
+    index = processor.build_transcript_index()
+    match = processor.find_matching_transcript("talk.mp4", index)
+    assert match.name == "talk_20240202_000000.vtt"
+
+
+def test_process_video_reuses_prebuilt_index(processor, monkeypatch):
+    index = processor.build_transcript_index()
+
+    def rescan():
+        raise AssertionError("transcripts directory rescanned")
+
+    monkeypatch.setattr(processor, "build_transcript_index", rescan)
+    result = processor.process_video("talk.mp4", index)
+
+    assert result["metadata"]["transcript_filename"] == "talk_20240202_000000.vtt"
+    assert result["segments"][0]["text"] == "Hello there"
+
+
+def test_process_all_videos_in_worker_processes(processor):
+    results = processor.process_all_videos()
+
+    assert [r["metadata"]["video_filename"] for r in results] == ["talk.mp4"]
+    assert results[0]["metadata"]["transcript_filename"] == "talk_20240202_000000.vtt"
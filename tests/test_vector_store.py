@@ -0,0 +1,164 @@
+import pytest
+from langchain_core.documents import Document
+
+import vector_store
+from semantic_cache import SemanticCache
+from vector_store import VideoTranscriptionStore
+
+HIT = {
+    "_score": 0.95,
+    "_source": {
+        "text": "Hello there",
+        "metadata": {"video_filename": "talk.mp4", "start_time": "00:00:00.000", "end_time": "00:00:02.000"},
+    },
+}
+FILTER = [{"term": {"metadata.video_filename.keyword": "talk.mp4"}}]
+
+
+class FakeEmbeddings:
+    def embed_query(self, text):
+        return [1.0, 0.0] if text == "first" else [0.0, 1.0]
+
+    def embed_queries(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+class FakeElasticsearch:
+    def __init__(self):
+        self.knn_clauses = []
+
+    def search(self, index, knn, size, source):
+        self.knn_clauses.append(knn)
+        return {"hits": {"hits": [HIT]}}
+
+    def msearch(self, searches):
+        bodies = searches[1::2]
+        self.knn_clauses.extend(body["knn"] for body in bodies)
+        return {"responses": [{"hits": {"hits": [HIT]}} for _ in bodies]}
+
+
+def _store():
+    store = VideoTranscriptionStore.__new__(VideoTranscriptionStore)
+    store.es = FakeElasticsearch()
+    store.embeddings = FakeEmbeddings()
+    store.search_cache = SemanticCache(threshold=0.99, max_entries=8)
+    store.generation = 0
+    return store
+
+
+def test_batch_search_applies_filter_like_single_search():
+    single, batch = _store(), _store()
+
+    single_results = list(single.search_transcriptions("first", k=2, filter=FILTER))
+    batch_results = batch.search_transcriptions_batch(["first", "second"], k=2, filter=FILTER)
+
+    assert single.es.knn_clauses[0]["filter"] == FILTER
+    assert [knn["filter"] for knn in batch.es.knn_clauses] == [FILTER, FILTER]
+    assert batch_results[0] == single_results
+
+
+def test_batch_search_cache_respects_filter():
+    store = _store()
+    store.search_transcriptions_batch(["first"], k=2)
+    store.search_transcriptions_batch(["first"], k=2, filter=FILTER)
+
+    # The unfiltered cached result must not answer the filtered search
+    assert len(store.es.knn_clauses) == 2
+    assert "filter" not in store.es.knn_clauses[0]
+    assert store.es.knn_clauses[1]["filter"] == FILTER
+
+
+class FakeIndices:
+    def __init__(self, properties=None):
+        self.properties = properties
+        self.refreshes = 0
+        self.settings = []
+
+    def refresh(self, index, **params):
+        self.refreshes += 1
+
+    def put_settings(self, index, settings):
+        self.settings.append(settings)
+
+    def get_mapping(self, index):
+        return {index: {"mappings": {"properties": self.properties}}}
+
+
+@pytest.mark.parametrize(
+    "properties",
+    [
+        {"embedding": {"type": "dense_vector", "dims": 1536}},
+        {"vector": {"type": "dense_vector", "dims": 1536}},
+    ],
+)
+def test_old_index_mapping_is_rejected(properties):
+    es = FakeElasticsearch()
+    es.indices = FakeIndices(properties)
+
+    with pytest.raises(Exception, match="Delete the index"):
+        _store()._check_vector_mapping(es)
+
+
+def test_current_index_mapping_is_accepted():
+    es = FakeElasticsearch()
+    es.indices = FakeIndices({"vector": {"type": "dense_vector", "dims": 512}})
+
+    _store()._check_vector_mapping(es)
+
+
+class FlakyEmbeddings:
+    def embed_documents(self, texts):
+        if len(texts) > 1 or texts[0] == "bad":
+            raise RuntimeError("embedding failed")
+        return [[1.0, 0.0]]
+
+
+def _document(text, start):
+    metadata = {"video_filename": "talk.mp4", "start_time": start, "end_time": start}
+    return Document(
+        id=VideoTranscriptionStore._segment_doc_id(metadata, text),
+        page_content=text,
+        metadata=metadata,
+    )
+
+
+def test_embedding_failures_are_recorded_by_segment_id():
+    store = _store()
+    store.embeddings = FlakyEmbeddings()
+    good, bad = _document("good", "00:00:01.000"), _document("bad", "00:00:02.000")
+    failed_segments = []
+
+    actions = list(store._index_actions([good, bad], failed_segments, 10, "talk.mp4"))
+
+    assert [action["_id"] for action in actions] == [good.id]
+    assert failed_segments == [(bad.id, "embedding failed")]
+
+
+def test_bulk_load_refreshes_once_at_the_end(monkeypatch):
+    def parallel_bulk(client, actions, **params):
+        for _ in actions:
+            yield True, {}
+
+    monkeypatch.setattr(vector_store.helpers, "parallel_bulk", parallel_bulk)
+    store = _store()
+    store.es.indices = FakeIndices()
+    documents = [_document("one", "00:00:01.000"), _document("two", "00:00:02.000")]
+
+    for document in documents:
+        store._index_documents([document], [], 10, "talk.mp4", refresh=False)
+    assert store.es.indices.refreshes == 0
+
+    store._end_bulk({"refresh_interval": "30s", "number_of_replicas": "0"})
+    assert store.es.indices.refreshes == 1
+    assert store.es.indices.settings == [
+        {"index": {"refresh_interval": "30s", "number_of_replicas": "0"}}
+    ]
+    assert store.generation == 1
+
+
+def test_search_cache_keeps_results_for_each_parameter_set():
+    store = _store()
+    for k in (2, 3, 2, 3):
+        list(store.search_transcriptions("first", k=k))
+
+    assert [knn["k"] for knn in store.es.knn_clauses] == [8, 12]